@@ -0,0 +1,153 @@
+"""
+batch
+~~~~~
+Columnar counterparts of ``classify_transaction`` and
+``build_journal_entry``.
+
+Both take the normalized transactions as a pandas DataFrame (columns
+``date, description, amount, direction``) and work on whole columns with
+vectorized string operations, giving exactly the same results as the
+per-row functions.
+"""
+
+import numpy as np
+import pandas as pd
+
+from accounting.classifier import (
+    EXPENSE_RE,
+    BANK_CHARGE_RE,
+    TRANSFER_RE,
+    INTEREST_RE,
+)
+from accounting.journal_builder import ledgers_for_type
+from accounting.narration import limited_narration
+from records import JournalEntry
+
+JOURNAL_COLUMNS = [
+    "date", "debit", "credit", "amount", "narration", "raw_description", "voucher_type",
+    "balance", "direction", "type",
+]
+
+
+def transactions_frame(transactions):
+    """Build the input frame from normalized transactions (records or dicts)."""
+    return pd.DataFrame(
+        [dict(t) for t in transactions],
+        columns=["date", "description", "amount", "balance", "direction"],
+    )
+
+
+def _contains(desc, pattern):
+    """Vectorized ``re.search`` / substring test that is always boolean."""
+    if isinstance(pattern, str):
+        return desc.str.contains(pattern, regex=False).to_numpy(dtype=bool)
+    return desc.str.contains(pattern.pattern, regex=True).to_numpy(dtype=bool)
+
+
+def classify_frame(df):
+    """
+    Return a Series of transaction types for every row of *df*,
+    following the same priority order as ``classify_transaction``.
+    """
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+
+    # Keyword tests run once per distinct description and are broadcast
+    # back to the rows through the factorized codes.
+    codes, uniques = pd.factorize(df["description"].astype(str).str.lower())
+    desc = pd.Series(uniques, dtype=object)
+    direction = df["direction"].to_numpy(dtype=object)
+
+    def has(pattern):
+        return _contains(desc, pattern)[codes]
+
+    is_transfer = has(TRANSFER_RE)
+    has_deposit = has("deposit")
+
+    conditions = [
+        has(EXPENSE_RE),
+        has("gst"),
+        has("loan"),
+        has("printing") | has("statement pr"),
+        has(BANK_CHARGE_RE) & ~has("recharge"),
+        ~is_transfer & has(INTEREST_RE),
+        direction == "credit",
+        direction == "debit",
+        is_transfer | has_deposit,
+    ]
+    choices = [
+        "general_expense", "gst", "loan", "printing", "bank_charges",
+        "interest", "sales", "purchase", "sales",
+    ]
+    types = np.select(conditions, choices, default="purchase")
+    return pd.Series(types.astype(object), index=df.index)
+
+
+def build_journal_frame(df, types=None):
+    """
+    Journal every row of *df* at once.  *types* defaults to
+    ``classify_frame(df)``.  'OPENING' rows are dropped.
+
+    Returns a DataFrame with the same keys as ``build_journal_entry``
+    (see ``JOURNAL_COLUMNS``).
+    """
+    keep = (df["date"] != "OPENING").to_numpy(dtype=bool)
+    df = df[keep]
+    if types is None:
+        types = classify_frame(df)
+    else:
+        types = types[keep]
+
+    if df.empty:
+        return pd.DataFrame(columns=JOURNAL_COLUMNS)
+
+    # Ledger names and narrations depend only on the type / description,
+    # so compute each distinct value once and broadcast.
+    ledgers = {t: ledgers_for_type(t) for t in types.unique()}
+    debit_by_type = {t: pair[0] for t, pair in ledgers.items()}
+    credit_by_type = {t: pair[1] for t, pair in ledgers.items()}
+    descriptions = df["description"].astype(str)
+    narrations = {d: limited_narration(d) for d in descriptions.unique()}
+
+    codes, uniques = pd.factorize(descriptions.str.lower())
+    is_contra = _contains(pd.Series(uniques, dtype=object), "cdr")[codes]
+    voucher_type = np.select(
+        [is_contra, (types == "sales").to_numpy(dtype=bool)],
+        ["Contra", "Receipt"],
+        default="Payment",
+    )
+
+    # Missing directions come back from pandas as NaN; keep them None
+    direction = df["direction"].to_numpy(dtype=object).copy()
+    direction[pd.isna(direction)] = None
+
+    return pd.DataFrame({
+        "date": df["date"].to_numpy(dtype=object),
+        "debit": types.map(debit_by_type).to_numpy(dtype=object),
+        "credit": types.map(credit_by_type).to_numpy(dtype=object),
+        "amount": df["amount"].to_numpy(),
+        "narration": descriptions.map(narrations).to_numpy(dtype=object),
+        "raw_description": descriptions.to_numpy(dtype=object),
+        "voucher_type": voucher_type.astype(object),
+        "balance": df["balance"].to_numpy(),
+        "direction": pd.Series(direction, dtype=object),
+        "type": types.to_numpy(dtype=object),
+    }, columns=JOURNAL_COLUMNS)
+
+
+def _paise_column(values):
+    """Rupee column -> list of integer paise (None where missing)."""
+    scaled = np.rint(pd.to_numeric(values).to_numpy(dtype=float) * 100)
+    missing = np.isnan(scaled)
+    paise = np.where(missing, 0, scaled).astype(np.int64).astype(object)
+    paise[missing] = None
+    return paise.tolist()
+
+
+def journal_entries_from_frame(journal):
+    """Convert a journal frame back to the per-row ``JournalEntry`` records the writers use."""
+    columns = {name: journal[name].tolist() for name in JOURNAL_COLUMNS}
+    columns["amount"] = _paise_column(journal["amount"])
+    columns["balance"] = _paise_column(journal["balance"])
+    # Same argument order as JOURNAL_COLUMNS
+    return [JournalEntry(*row) for row in zip(*(columns[name] for name in JOURNAL_COLUMNS))]
@@ -1,20 +1,42 @@
 import re
 
+# ── Rule tables ────────────────────────────────────────────────────────
+# Each keyword list is compiled once into a single alternation regex, so
+# a stage costs one regex search per description instead of a Python
+# loop of substring checks.  Stages are still evaluated in priority
+# order and short-circuit exactly like the original any(...) chains.
+
+# These are flagged as 'general_expense' (Debit: General Expenses A/c)
+# This separates them from normal 'Purchase' payments.
+EXPENSE_KEYWORDS = [
+    "pdd", "jkpdd", "kpdcl", "electricity",   # Power
+    "jio", "airtel", "bsnl", "vi ", "vodafone", # Telecom
+    "recharge", "prepaid", "postpaid", "billpay" # Generic Bill words
+]
+
+BANK_CHARGE_KEYWORDS = ["sms", "cibil", "fee", "inspc", "commissio", "charge", "chrg", "recovery"]
+
+# What a "Transfer" looks like
+TRANSFER_KEYWORDS = ["mtfr", "neft", "rtgs", "upi", "imps", "trf", "by cash", "mbill", "ebil"]
+
+def _compile_keywords(keywords):
+    """One alternation regex matching any of *keywords* as a plain substring."""
+    # Longest first, so the alternation never stops at a shorter prefix
+    ordered = sorted(keywords, key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in ordered))
+
+EXPENSE_RE = _compile_keywords(EXPENSE_KEYWORDS)
+BANK_CHARGE_RE = _compile_keywords(BANK_CHARGE_KEYWORDS)
+TRANSFER_RE = _compile_keywords(TRANSFER_KEYWORDS)
+INTEREST_RE = re.compile(r"\binterest\b|int\.coll|i nt\.coll")
+
 def classify_transaction(txn):
     # Normalize description for matching
     desc = txn["description"].lower()
     direction = txn.get("direction")
 
     # --- 1. SPECIFIC EXPENSES (Utilities / Recharges) ---
-    # These are flagged as 'general_expense' (Debit: General Expenses A/c)
-    # This separates them from normal 'Purchase' payments.
-    expense_keywords = [
-        "pdd", "jkpdd", "kpdcl", "electricity",   # Power
-        "jio", "airtel", "bsnl", "vi ", "vodafone", # Telecom
-        "recharge", "prepaid", "postpaid", "billpay" # Generic Bill words
-    ]
-    
-    if any(k in desc for k in expense_keywords):
+    if EXPENSE_RE.search(desc):
         return "general_expense"
 
     # --- 2. SPECIFIC LEDGER CHARGES ---
@@ -28,24 +50,18 @@ def classify_transaction(txn):
     # --- 3. BANK CHARGES ---
     # We check these BEFORE "transfers" because sometimes "NEFT CHARGES" 
     # has both words. We want it to be a Charge, not a Transfer.
-    charge_keywords = ["sms", "cibil", "fee", "inspc", "commissio", "charge", "chrg", "recovery"]
-    
-    if any(x in desc for x in charge_keywords):
-        # EXCEPTION: "Recharge" is already caught in Step 1.
-        # But if it somehow slipped through, we ignore it here so it doesn't become "Bank Charges"
-        if "recharge" in desc:
-            pass 
-        else:
-            return "bank_charges"
+    # EXCEPTION: "Recharge" is already caught in Step 1.
+    # But if it somehow slipped through, we ignore it here so it doesn't become "Bank Charges"
+    if BANK_CHARGE_RE.search(desc) and "recharge" not in desc:
+        return "bank_charges"
 
     # --- 4. SAFEGUARDS (For Interest) ---
-    # Define what a "Transfer" looks like
-    is_transfer = any(x in desc for x in ["mtfr", "neft", "rtgs", "upi", "imps", "trf", "by cash", "mbill", "ebil"])
+    is_transfer = TRANSFER_RE.search(desc) is not None
 
     # Interest Check: MUST NOT be a transfer
     # This prevents footer text like "Interest Rate 10%" from mislabeling a transfer.
     if not is_transfer:
-        if re.search(r"\binterest\b", desc) or "int.coll" in desc or "i nt.coll" in desc:
+        if INTEREST_RE.search(desc):
             return "interest"
 
     # --- 5. DIRECTION-BASED (The Default Buckets) ---
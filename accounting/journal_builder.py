@@ -1,13 +1,24 @@
 from config import LEDGER_MAP
+from accounting.classifier import classify_transaction
 from accounting.narration import limited_narration
+from instrumentation import NULL_RECORDER
+from records import JournalEntry, Transaction
 
-def build_journal_entry(txn, txn_type):
-    # Use 'amount' which is consistent across all normalized rows
-    amount = txn["amount"]
-    date = txn["date"]
-    raw_description = txn["description"]
-    narration = limited_narration(raw_description)
+def iter_journal_entries(transactions, recorder=NULL_RECORDER):
+    """
+    Lazily classify and journal each normalized transaction.
+    The internal 'OPENING' row is skipped.  *recorder* times the
+    "classify" and "journal" calls.
+    """
+    classify = recorder.timed("classify", classify_transaction)
+    build = recorder.timed("journal", build_journal_entry)
+    for txn in transactions:
+        if txn["date"] == "OPENING":
+            continue
+        yield build(txn, classify(txn))
 
+def ledgers_for_type(txn_type):
+    """Return the (debit, credit) ledger names for a classifier type."""
     debit = ""
     credit = ""
 
@@ -39,6 +50,20 @@ def build_journal_entry(txn, txn_type):
         debit = LEDGER_MAP["purchase"]
         credit = LEDGER_MAP["bank"]
 
+    return debit, credit
+
+def build_journal_entry(txn, txn_type):
+    """
+    Journal one normalized transaction (a ``records.Transaction``, or
+    the equivalent dict) as a ``records.JournalEntry``.
+    """
+    txn = Transaction.from_dict(txn)
+    date = txn.date
+    raw_description = txn.description
+    narration = limited_narration(raw_description)
+
+    debit, credit = ledgers_for_type(txn_type)
+
     # --- VOUCHER TYPE DETERMINATION ---
     # Priority: CDR keyword (Contra) > Sales (Receipt) > Everything else (Payment)
     if "cdr" in raw_description.lower():
@@ -48,12 +73,10 @@ def build_journal_entry(txn, txn_type):
     else:
         voucher_type = "Payment"
 
-    return {
-        "date": date,
-        "debit": debit,
-        "credit": credit,
-        "amount": amount,
-        "narration": narration,
-        "raw_description": raw_description,
-        "voucher_type": voucher_type
-    }
+    return JournalEntry(
+        date, debit, credit, txn.amount_paise, narration, raw_description, voucher_type,
+        # Carried through for the columnar export (writers.columnar)
+        balance_paise=txn.balance_paise,
+        direction=txn.direction,
+        type=txn_type,
+    )
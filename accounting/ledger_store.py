@@ -0,0 +1,414 @@
+"""
+ledger_store
+~~~~~~~~~~~~
+Consolidated, indexed ledger across many statements of one client.
+
+``LedgerStore.add_statement`` merges the journal entries of a statement
+(from ``iter_journal_entries`` or ``writers.columnar.load_entries``) for
+one bank account.  Each account gets its own bank ledger (e.g.
+"SBI Bank A/c (8901)") in place of the generic "Bank A/c", so the
+accounts stay apart once merged.
+
+Transfers between the client's own accounts appear twice, as money out
+of one statement and money in on another.  Two transfer-like entries of
+different accounts with the same amount, opposite directions and dates
+at most ``transfer_window_days`` apart are collapsed into a single
+Contra entry between the two bank ledgers, but only if *both* show that
+the money stays with the client: a Contra voucher, a SELF / OWN marker,
+or the other account's number (or its last 4 digits) in the
+description.  Transfer keywords alone ("UPI", "NEFT", "BY CASH") are on
+most merchant payments and receipts, and never merge anything.
+
+Entries are kept column-wise (arrays of integer paise, day ordinals and
+interned ledger / counterparty codes); a million entries take about
+210 MiB, most of it narration text.  Indexes by day, ledger and counterparty are appended to as
+statements are added, and ``query`` starts from the smallest of them
+instead of scanning every entry.
+"""
+
+import datetime
+import re
+from array import array
+from itertools import chain
+
+from accounting.classifier import TRANSFER_KEYWORDS, TRANSFER_RE
+from accounting.narration import NOISE_WORDS
+from config import LEDGER_MAP
+from parser.account_state import date_key
+from records import JournalEntry, to_paise
+
+DEFAULT_TRANSFER_WINDOW_DAYS = 1
+
+VOUCHER_TYPES = ("Payment", "Receipt", "Contra")
+
+# Rows whose date cannot be read; found by ledger / counterparty
+# queries, never by date ranges
+UNDATED = 0
+
+# Combined (amount, day) key of the open-transfer pool; day ordinals
+# stay below this until the year 2739
+_DAY_SPAN = 1_000_000
+
+# Own-account evidence in a (uppercased) description
+_OWN_ACCOUNT_RE = re.compile(r"\b(?:SELF|OWN)\b")
+# Digit groups that may be (the tail of) an account number: not glued to
+# letters (IFSC codes such as "HDFC0001234"), except an "XX" mask
+_ACCOUNT_REF_RE = re.compile(r"(?<![A-WYZa-wyz\d])\d{4,}")
+
+_COUNTERPARTY_SPLIT_RE = re.compile(r"[/*|]")
+_COUNTERPARTY_STOPWORDS = (
+    {k.upper() for k in TRANSFER_KEYWORDS if " " not in k}
+    | NOISE_WORDS
+    | {"TRANSFER", "P2A", "P2P", "PAYMENT", "FROM", "FOR"}
+)
+
+
+def counterparty(description):
+    """
+    Best-effort name of the other party of a transfer, e.g.
+    "TO TRANSFER-UPI/DR/412345/RAHUL KUMAR/YESB/..." -> "RAHUL KUMAR".
+    None for anything that does not look like a transfer.
+    """
+    if not description or not TRANSFER_RE.search(description.lower()):
+        return None
+    return _counterparty_name(description)
+
+
+def _counterparty_name(description):
+    for segment in _COUNTERPARTY_SPLIT_RE.split(description):
+        words = [
+            w for w in segment.replace("-", " ").split()
+            if w.isalpha() and w.upper() not in _COUNTERPARTY_STOPWORDS
+        ]
+        name = " ".join(words).upper()
+        if len(name) >= 3:
+            return name
+    return None
+
+
+def account_ledger(bank, account_number=None):
+    """The bank ledger name used for one account in the consolidated view."""
+    name = f"{bank} {LEDGER_MAP['bank']}"
+    return f"{name} ({account_number[-4:]})" if account_number else name
+
+
+def _day(date):
+    key = date_key(date) if isinstance(date, str) else None
+    if key is None:
+        return UNDATED
+    try:
+        return datetime.date(*key).toordinal()
+    except ValueError:
+        return UNDATED
+
+
+def _day_of(value):
+    """Day ordinal for a query bound: a ``datetime.date`` or a statement date string."""
+    if isinstance(value, datetime.date):
+        return value.toordinal()
+    day = _day(value)
+    if day == UNDATED:
+        raise ValueError(f"unreadable date: {value!r}")
+    return day
+
+
+class _Interner:
+    """Two-way mapping between strings and small integer codes."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class LedgerStore:
+    """In-memory consolidated ledger; see the module docstring."""
+
+    def __init__(self, transfer_window_days=DEFAULT_TRANSFER_WINDOW_DAYS):
+        self.transfer_window_days = transfer_window_days
+
+        # ── Columns (one slot per row) ─────────────────────────────────
+        self._day = array("i")
+        self._paise = array("q")
+        self._debit = array("I")
+        self._credit = array("I")
+        self._voucher = array("B")
+        self._account = array("H")
+        self._counterparty = array("I")   # 0 = none
+        self._narration = []               # shared str objects
+
+        self._ledgers = _Interner()
+        self._accounts = []                # (bank, account_number, ledger code)
+        self._account_ids = {}
+        self._counterparties = _Interner()
+        self._counterparties.code(None)
+        self._narrations = {}
+
+        # ── Indexes (append-only row lists) ────────────────────────────
+        self._by_day = {}            # day -> rows
+        self._by_ledger = {}         # ledger -> {day: rows}
+        self._by_counterparty = {}   # counterparty -> rows
+
+        # Unmatched transfer rows by amount and day (see _transfer_key),
+        # and their own-account evidence: row -> (marked, digit groups)
+        self._open_transfers = {}
+        self._transfer_evidence = {}
+
+        self.transfers_merged = 0
+
+    def __len__(self):
+        return len(self._day)
+
+    # ── Loading ────────────────────────────────────────────────────────
+
+    def _account_id(self, bank, account_number):
+        key = (bank, account_number or None)
+        account = self._account_ids.get(key)
+        if account is None:
+            account = self._account_ids[key] = len(self._accounts)
+            self._accounts.append((bank, account_number, self._ledgers.code(account_ledger(*key))))
+        return account
+
+    def _refers_to(self, refs, account):
+        """Whether one of the digit groups *refs* names *account*."""
+        number = self._accounts[account][1]
+        digits = re.sub(r"\D", "", number or "")
+        if len(digits) < 4:
+            return False
+        return any(r == digits[-4:] or (len(r) >= 6 and digits.endswith(r)) for r in refs)
+
+    @staticmethod
+    def _transfer_key(paise, day):
+        return paise * _DAY_SPAN + day
+
+    def add_statement(self, entries, bank, account_number=None):
+        """
+        Merge the journal *entries* of one statement of the account
+        (*bank*, *account_number*).  Returns ``{"added", "merged"}``:
+        new rows, and entries absorbed into an existing transfer.
+        """
+        account = self._account_id(bank, account_number)
+        bank_code = self._accounts[account][2]
+        generic_bank = LEDGER_MAP["bank"]
+        ledger = self._ledgers.code
+        days = {}   # a statement has far fewer dates than entries
+        added = merged = 0
+
+        for e in entries:
+            day = days.get(e["date"])
+            if day is None:
+                day = days[e["date"]] = _day(e["date"])
+            # Records carry exact paise; plain entry dicts carry rupees
+            paise = e.amount_paise if isinstance(e, JournalEntry) else to_paise(e["amount"])
+            debit = bank_code if e["debit"] == generic_bank else ledger(e["debit"])
+            credit = bank_code if e["credit"] == generic_bank else ledger(e["credit"])
+            description = e.get("raw_description") or e.get("narration", "")
+            transfer_words = TRANSFER_RE.search(description.lower()) is not None
+
+            # 1. One side of a transfer between two of the client's
+            #    accounts?  Needs own-account evidence (see module doc)
+            is_contra = e["voucher_type"] == "Contra"
+            is_transfer = (
+                (transfer_words or is_contra)
+                and day != UNDATED
+                and (debit == bank_code) != (credit == bank_code)
+            )
+            if is_transfer:
+                marked = is_contra or _OWN_ACCOUNT_RE.search(description.upper()) is not None
+                refs = frozenset(_ACCOUNT_REF_RE.findall(description))
+                is_transfer = marked or bool(refs)
+            if is_transfer:
+                evidence = (marked, refs)
+                if self._merge_transfer(account, day, paise, money_in=debit == bank_code,
+                                        evidence=evidence):
+                    merged += 1
+                    continue
+
+            # 2. New row
+            row = len(self._day)
+            narration = e.get("narration", "")
+            self._day.append(day)
+            self._paise.append(paise)
+            self._debit.append(debit)
+            self._credit.append(credit)
+            self._voucher.append(VOUCHER_TYPES.index(e["voucher_type"]))
+            self._account.append(account)
+            name = _counterparty_name(description) if transfer_words else None
+            self._counterparty.append(self._counterparties.code(name))
+            self._narration.append(self._narrations.setdefault(narration, narration))
+            added += 1
+
+            # 3. Indexes
+            self._by_day.setdefault(day, array("I")).append(row)
+            self._index_ledger(debit, day, row)
+            self._index_ledger(credit, day, row)
+            if self._counterparty[row]:
+                self._by_counterparty.setdefault(self._counterparty[row], array("I")).append(row)
+            if is_transfer:
+                key = self._transfer_key(paise, day)
+                self._open_transfers.setdefault(key, []).append(row)
+                self._transfer_evidence[row] = evidence
+
+        self.transfers_merged += merged
+        return {"added": added, "merged": merged}
+
+    def _index_ledger(self, code, day, row):
+        self._by_ledger.setdefault(code, {}).setdefault(day, array("I")).append(row)
+
+    def _merge_transfer(self, account, day, paise, money_in, evidence):
+        """
+        Find an open transfer row of another account with this amount,
+        the opposite direction and a date within the window (closest
+        first), where both entries carry own-account *evidence* for the
+        pair; turn it into the Contra between the two bank ledgers.
+        """
+        marked, refs = evidence
+        window = self.transfer_window_days
+        for offset in chain([0], *((-d, d) for d in range(1, window + 1))):
+            key = self._transfer_key(paise, day + offset)
+            rows = self._open_transfers.get(key)
+            if not rows:
+                continue
+            for i, row in enumerate(rows):
+                other = self._account[row]
+                other_bank = self._accounts[other][2]
+                other_in = self._debit[row] == other_bank
+                if other == account or other_in == money_in:
+                    continue
+                other_marked, other_refs = self._transfer_evidence[row]
+                if not (marked or self._refers_to(refs, other)):
+                    continue
+                if not (other_marked or self._refers_to(other_refs, account)):
+                    continue
+
+                # Money leaves the paying account (credit) and enters
+                # the receiving one (debit)
+                this_bank = self._accounts[account][2]
+                if money_in:
+                    self._debit[row], self._credit[row] = this_bank, other_bank
+                else:
+                    self._debit[row], self._credit[row] = other_bank, this_bank
+                self._voucher[row] = VOUCHER_TYPES.index("Contra")
+                self._index_ledger(this_bank, self._day[row], row)
+
+                del rows[i]
+                del self._transfer_evidence[row]
+                if not rows:
+                    del self._open_transfers[key]
+                return True
+        return False
+
+    # ── Queries ────────────────────────────────────────────────────────
+
+    def _entry(self, row):
+        day = self._day[row]
+        bank, account_number, _ = self._accounts[self._account[row]]
+        return {
+            "date": datetime.date.fromordinal(day).strftime("%d/%m/%Y") if day else "",
+            "debit": self._ledgers.values[self._debit[row]],
+            "credit": self._ledgers.values[self._credit[row]],
+            "amount": self._paise[row] / 100,
+            "narration": self._narration[row],
+            "voucher_type": VOUCHER_TYPES[self._voucher[row]],
+            "bank": bank,
+            "account_number": account_number,
+            "counterparty": self._counterparties.values[self._counterparty[row]],
+        }
+
+    @staticmethod
+    def _bounds(start, end):
+        lo = _day_of(start) if start is not None else UNDATED + 1
+        hi = _day_of(end) if end is not None else _DAY_SPAN - 1
+        return lo, hi
+
+    @staticmethod
+    def _days(by_day, lo, hi):
+        """Sorted days of the *by_day* index in ``lo .. hi`` (inclusive)."""
+        if hi - lo > len(by_day):
+            return sorted(d for d in by_day if lo <= d <= hi)
+        return [d for d in range(lo, hi + 1) if d in by_day]
+
+    def query(self, ledger=None, start=None, end=None, counterparty=None):
+        """
+        Entries matching every given filter, in date order:
+
+        *ledger*
+            posted on either side of this ledger (e.g. "Purchase A/c");
+        *start*, *end*
+            inclusive date range (``datetime.date`` or statement date
+            strings); undated rows never match a range;
+        *counterparty*
+            the transfer counterparty name (see ``counterparty()``).
+
+        Rows are read from the smallest matching index (a ledger's rows
+        are indexed per day, so ledger + date range reads only the
+        matching days); the other filters are checked per row.
+        """
+        dated = start is not None or end is not None
+        lo, hi = self._bounds(start, end) if dated else (UNDATED, _DAY_SPAN - 1)
+
+        def day_rows(by_day):
+            days = self._days(by_day, lo, hi)
+            return sum(len(by_day[d]) for d in days), chain.from_iterable(by_day[d] for d in days)
+
+        checks = {}    # filter -> per-row check
+        sources = []   # (size, rows, filters those rows already satisfy)
+        if ledger is not None:
+            code = self._ledgers.codes.get(ledger)
+            # Always checked: rows stay indexed under ledgers they lost
+            # when a transfer was merged
+            checks["ledger"] = lambda r: self._debit[r] == code or self._credit[r] == code
+            size, rows = day_rows(self._by_ledger.get(code, {}))
+            sources.append((size, rows, {"date"}))
+        if counterparty is not None:
+            cp_code = self._counterparties.codes.get(counterparty.upper())
+            checks["counterparty"] = lambda r: self._counterparty[r] == cp_code
+            rows = self._by_counterparty.get(cp_code, ()) if cp_code else ()
+            sources.append((len(rows), rows, {"counterparty"}))
+        if dated:
+            checks["date"] = lambda r: lo <= self._day[r] <= hi
+            size, rows = day_rows(self._by_day)
+            sources.append((size, rows, {"date"}))
+        if not sources:
+            sources.append((len(self), range(len(self)), set()))
+
+        _, rows, covered = min(sources, key=lambda s: s[0])
+        checks = [check for name, check in checks.items() if name not in covered]
+
+        matched = sorted(
+            {r for r in rows if all(check(r) for check in checks)},
+            key=lambda r: (self._day[r], r),
+        )
+        return [self._entry(r) for r in matched]
+
+    def ledgers(self):
+        """Every ledger name in the store."""
+        return list(self._ledgers.values)
+
+    def accounts(self):
+        """``[(bank, account_number, ledger name)]`` of the merged accounts."""
+        return [(b, n, self._ledgers.values[code]) for b, n, code in self._accounts]
+
+    def totals(self, start=None, end=None):
+        """``{ledger: (debit total, credit total)}`` in rupees, for a date range."""
+        if start is None and end is None:
+            rows = range(len(self))
+        else:
+            days = self._days(self._by_day, *self._bounds(start, end))
+            rows = chain.from_iterable(self._by_day[d] for d in days)
+        debit = {}
+        credit = {}
+        for r in rows:
+            paise = self._paise[r]
+            debit[self._debit[r]] = debit.get(self._debit[r], 0) + paise
+            credit[self._credit[r]] = credit.get(self._credit[r], 0) + paise
+        return {
+            self._ledgers.values[code]: (debit.get(code, 0) / 100, credit.get(code, 0) / 100)
+            for code in set(debit) | set(credit)
+        }
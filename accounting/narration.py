@@ -1,7 +1,19 @@
 import re
+from functools import lru_cache
 
 MAX_NARRATION_LEN = 40
 
+# Distinct descriptions remembered by the memo layer.  Recurring payees
+# and charge lines repeat thousands of times per statement, so even a
+# modest cache turns most calls into a dict lookup.
+NARRATION_CACHE_SIZE = 8192
+
+# Date prefix (e.g., 02-04-2025 or 02/04/25)
+_DATE_PREFIX_RE = re.compile(r"^\d{2}[-/]\d{2}([-/]\d{2,4})?\s*")
+
+# Separators (slash, hyphen, colon, dot) -> spaces; same as re.sub(r"[-/:\.]", " ")
+_SEPARATORS = str.maketrans("-/:.", "    ")
+
 # 1. Key Transaction Types (ALWAYS KEEP)
 IMPORTANT_TYPES = {
     "MTFR", "NEFT", "RTGS", "UPI", "IMPS", "ATM", "POS", "ECOM", 
@@ -16,16 +28,34 @@ NOISE_WORDS = {
 def limited_narration(raw_text):
     if not raw_text:
         return ""
-    
+    return _build_narration(raw_text)
+
+def narration_cache_stats():
+    """Hit/miss counters of the narration memo, plus the hit rate."""
+    info = _build_narration.cache_info()
+    calls = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_rate": info.hits / calls if calls else 0.0,
+    }
+
+def clear_narration_cache():
+    _build_narration.cache_clear()
+
+@lru_cache(maxsize=NARRATION_CACHE_SIZE)
+def _build_narration(raw_text):
     # --- Step 1: Clean Structure ---
     text = raw_text.strip()
     
     # Remove Date Prefix (e.g., 02-04-2025 or 02/04/25)
     # We remove this because you already have a Date column.
-    text = re.sub(r"^\d{2}[-/]\d{2}([-/]\d{2,4})?\s*", "", text)
+    text = _DATE_PREFIX_RE.sub("", text, count=1)
     
     # Replace separators (slash, hyphen, colon) with spaces for better tokenizing
-    text = re.sub(r"[-/:\.]", " ", text)
+    text = text.translate(_SEPARATORS)
     
     # Tokenize
     tokens = text.split()
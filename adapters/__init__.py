@@ -4,11 +4,12 @@ from adapters.sbi import SBIAdapter
 from adapters.jkb import JKBAdapter
 
 
-def get_adapter(bank):
+def get_adapter(bank, **options):
+    """Return the adapter for *bank*; *options* go to its constructor."""
     if bank == "HDFC":
-        return HDFCAdapter()
+        return HDFCAdapter(**options)
     if bank == "SBI":
-        return SBIAdapter()
+        return SBIAdapter(**options)
     if bank == "JKB":
-        return JKBAdapter()
-    return GenericAdapter()
+        return JKBAdapter(**options)
+    return GenericAdapter(**options)
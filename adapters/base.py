@@ -1,5 +1,6 @@
 import re
 
+from adapters.line_filters import LineFilters
 
 class BaseAdapter:
     """
@@ -13,16 +14,24 @@ class BaseAdapter:
         """
         Return a list of lowercase substrings.  Any extracted line whose
         lowercased form contains one of these is silently skipped.
+        Compiled once per adapter class (see ``line_filters``), so it
+        must not depend on instance state.
         """
         return []
 
+    def opening_balance_markers(self):
+        """
+        Return a list of uppercase substrings that mark an opening-balance
+        row.  Compiled once per adapter class, like ``junk_patterns``.
+        """
+        return ["B/F", "BROUGHT FORWARD", "BALANCE AS ON", "OPENING BALANCE"]
+
     def is_opening_balance(self, line_upper):
         """
         Return True if *line_upper* (already uppercased) represents an
-        opening-balance row.  Default detects common markers.
+        opening-balance row.  Default matches ``opening_balance_markers``.
         """
-        markers = ["B/F", "BROUGHT FORWARD", "BALANCE AS ON", "OPENING BALANCE"]
-        return any(m in line_upper for m in markers)
+        return self.line_filters().is_opening_balance(line_upper)
 
     def parse_date_and_text(self, clean_line):
         """
@@ -38,10 +47,25 @@ class BaseAdapter:
         """
         return text
 
+    # ── Compiled filters ───────────────────────────────────────────────
+
+    def line_filters(self):
+        """
+        The ``LineFilters`` compiled from this adapter's hooks, built on
+        first use and cached on the class (each subclass gets its own).
+        """
+        cls = type(self)
+        filters = cls.__dict__.get("_line_filters")
+        if filters is None:
+            filters = LineFilters(self.junk_patterns(), self.opening_balance_markers())
+            cls._line_filters = filters
+        return filters
+
     # ── Core interface ─────────────────────────────────────────────────
 
-    def build_context(self, pdf_path):
+    def build_context(self, source):
         """
+        *source* is a PDF path or an open ``StatementDocument``.
         Must return a StatementContext dict:
         {
           bank,
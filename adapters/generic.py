@@ -1,9 +1,10 @@
-import pdfplumber
 import re
 
 from adapters.base import BaseAdapter
-from parser.row_normalizer import normalize_transactions
+from parser.row_normalizer import normalize_transactions, iter_normalized_transactions
 from parser.account_holder import extract_account_holder_name
+from parser.statement_document import open_statement
+from instrumentation import NULL_RECORDER
 
 # Date regex — matches DD-MM-YYYY, DD/MM/YYYY, DD/MM/YY
 DATE_RE = re.compile(r"^\d{2}[-/]\d{2}[-/]\d{2,4}")
@@ -16,13 +17,18 @@ class GenericAdapter(BaseAdapter):
     adapters override hooks instead of reimplementing the whole pipeline.
     """
 
+    def __init__(self, page_workers=1):
+        # >1 extracts page text in that many worker processes
+        self.page_workers = page_workers
+
     # ── Pipeline ───────────────────────────────────────────────────────
 
-    def build_context(self, pdf_path):
-        raw_txns = self._extract_transactions(pdf_path)
-        transactions = normalize_transactions(raw_txns)
+    def build_context(self, source):
+        with open_statement(source) as doc:
+            raw_txns = self._extract_transactions(doc)
+            account_holder = extract_account_holder_name(doc)
 
-        account_holder = extract_account_holder_name(pdf_path)
+        transactions = normalize_transactions(raw_txns)
 
         return {
             "bank": "UNKNOWN",
@@ -35,90 +41,111 @@ class GenericAdapter(BaseAdapter):
             },
         }
 
+    def iter_transactions(self, doc, recorder=NULL_RECORDER, start_page=0):
+        """
+        Streaming counterpart of ``build_context()["transactions"]``:
+        lazily yield normalized transactions page by page.  *doc* is an
+        open ``StatementDocument`` and must stay open while iterating.
+        *recorder* (an ``instrumentation.StageRecorder``) times the
+        "extract" and "normalize" steps separately.  Pages before
+        *start_page* are not read at all (see ``parser.account_state``).
+        """
+        raw = recorder.iterate("extract", self._iter_raw_transactions(doc, start_page))
+        return recorder.iterate("normalize", iter_normalized_transactions(raw))
+
     # ── Transaction extraction (uses adapter hooks) ────────────────────
 
-    def _extract_transactions(self, pdf_path):
+    def _extract_transactions(self, source):
         """
-        Walk every page of the PDF, split into lines, and group them
-        into raw transaction dicts ``{date, text}``.
+        Walk every page of the statement, split into lines, and group
+        them into raw transaction dicts ``{date, text}``.  *source* is a
+        PDF path or an open ``StatementDocument``.
 
         All bank-specific decisions are delegated to hook methods:
-        - ``self.junk_patterns()``
+        - ``self.junk_patterns()`` / ``self.opening_balance_markers()``
+          (compiled once per class, see ``line_filters()``)
         - ``self.is_opening_balance(line_upper)``
         - ``self.parse_date_and_text(clean_line)``
         - ``self.clean_raw_text(text)``
         """
-        junk = self.junk_patterns()
-        transactions = []
+        with open_statement(source) as doc:
+            return list(self._iter_raw_transactions(doc))
+
+    def _iter_raw_transactions(self, doc, start_page=0):
+        if self.page_workers > 1:
+            # Extract page text in parallel; grouping below still
+            # runs serially over the pages in document order.
+            doc.prefetch_pages(self.page_workers, start=start_page)
+        return self._group_lines(doc.page_texts(start_page))
+
+    def _group_lines(self, page_texts):
+        """
+        Line-grouping state machine behind ``_extract_transactions``.
+        *page_texts* is an iterable of page strings in document order;
+        raw transactions are yielded as soon as they are complete.
+        """
+        filters = self.line_filters()
         current = None
         in_page_footer = False
 
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                raw_text = page.extract_text()
-                if not raw_text:
+        for raw_text in page_texts:
+            if not raw_text:
+                continue
+
+            # Reset page-footer flag at the start of each new page
+            in_page_footer = False
+
+            for line in raw_text.split("\n"):
+                # 1. Clean CSV artifacts
+                clean_line = line.replace('"', '').replace("','", " ").strip()
+                if not clean_line:
+                    continue
+
+                # 2. Skip junk / disclaimer lines (adapter-supplied)
+                if filters.is_junk(clean_line.lower()):
                     continue
 
-                # Reset page-footer flag at the start of each new page
-                in_page_footer = False
-
-                for line in raw_text.split("\n"):
-                    # 1. Clean CSV artifacts
-                    clean_line = line.replace('"', '').replace("','", " ").strip()
-                    if not clean_line:
-                        continue
-
-                    # 2. Skip junk / disclaimer lines (adapter-supplied)
-                    if junk and any(pat in clean_line.lower() for pat in junk):
-                        continue
-
-                    # 3. Totals and separators mark end of page's transactions.
-                    #    Finalize current txn and stop appending until next date.
-                    is_separator = (
-                        len(clean_line) > 3
-                        and all(c in "-=_ " for c in clean_line)
-                    )
-                    if "TOTAL" in clean_line.upper() or is_separator:
-                        if current and not in_page_footer:
-                            current["text"] = self.clean_raw_text(current["text"])
-                            transactions.append(current)
-                            current = None
-                        in_page_footer = True
-                        continue
-
-                    # 3b. Skip standalone short numeric lines (e.g. pincodes)
-                    if clean_line.isdigit() and len(clean_line) <= 6:
-                        continue
-
-                    # 4. Opening balance
-                    upper_line = clean_line.upper()
-                    if self.is_opening_balance(upper_line):
-                        if current:
-                            current["text"] = self.clean_raw_text(current["text"])
-                            transactions.append(current)
-
-                        current = {"date": "OPENING", "text": clean_line}
-                        in_page_footer = False
-                        continue
-
-                    # 5. Standard transaction (line starts with a date)
-                    if DATE_RE.match(clean_line):
-                        if current:
-                            current["text"] = self.clean_raw_text(current["text"])
-                            transactions.append(current)
-
-                        date, text = self.parse_date_and_text(clean_line)
-                        current = {"date": date, "text": text}
-                        in_page_footer = False
-                    else:
-                        # Continuation line — append to current transaction
-                        # but only if we haven't hit a page footer
-                        if current and not in_page_footer:
-                            current["text"] += " " + clean_line
+                # 3. Totals and separators mark end of page's transactions.
+                #    Finalize current txn and stop appending until next date.
+                upper_line = clean_line.upper()
+                if filters.is_footer(upper_line):
+                    if current and not in_page_footer:
+                        current["text"] = self.clean_raw_text(current["text"])
+                        yield current
+                        current = None
+                    in_page_footer = True
+                    continue
+
+                # 3b. Skip standalone short numeric lines (e.g. pincodes)
+                if clean_line.isdigit() and len(clean_line) <= 6:
+                    continue
+
+                # 4. Opening balance
+                if self.is_opening_balance(upper_line):
+                    if current:
+                        current["text"] = self.clean_raw_text(current["text"])
+                        yield current
+
+                    current = {"date": "OPENING", "text": clean_line}
+                    in_page_footer = False
+                    continue
+
+                # 5. Standard transaction (line starts with a date)
+                if DATE_RE.match(clean_line):
+                    if current:
+                        current["text"] = self.clean_raw_text(current["text"])
+                        yield current
+
+                    date, text = self.parse_date_and_text(clean_line)
+                    current = {"date": date, "text": text}
+                    in_page_footer = False
+                else:
+                    # Continuation line — append to current transaction
+                    # but only if we haven't hit a page footer
+                    if current and not in_page_footer:
+                        current["text"] += " " + clean_line
 
         # Flush the last transaction
         if current:
             current["text"] = self.clean_raw_text(current["text"])
-            transactions.append(current)
-
-        return transactions
+            yield current
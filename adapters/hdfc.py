@@ -4,8 +4,8 @@ from adapters.generic import GenericAdapter
 class HDFCAdapter(GenericAdapter):
     """Adapter for HDFC Bank statements."""
 
-    def build_context(self, pdf_path):
-        context = super().build_context(pdf_path)
+    def build_context(self, source):
+        context = super().build_context(source)
         context["bank"] = "HDFC"
         context["confidence"]["bank"] = 1.0
         return context
\ No newline at end of file
@@ -49,13 +49,13 @@ class JKBAdapter(GenericAdapter):
         """Check if line is just a standalone pincode (6 digits)."""
         return clean_line.strip().isdigit() and len(clean_line.strip()) == 6
 
-    def is_opening_balance(self, line_upper):
-        return any(m in line_upper for m in ["B/F", "BROUGHT FORWARD"])
+    def opening_balance_markers(self):
+        return ["B/F", "BROUGHT FORWARD"]
 
     # ── Context ────────────────────────────────────────────────────────
 
-    def build_context(self, pdf_path):
-        context = super().build_context(pdf_path)
+    def build_context(self, source):
+        context = super().build_context(source)
         context["bank"] = "JKB"
         context["confidence"]["bank"] = 1.0
         return context
@@ -0,0 +1,73 @@
+"""
+line_filters
+~~~~~~~~~~~~
+Precompiled per-line checks for the line-grouping loop in
+``GenericAdapter``.
+
+The junk and opening-balance checks used to test every line against
+every pattern (``any(pat in line for pat in patterns)``), so their cost
+grew with the pattern list (~30 entries for JKB).  ``LineFilters``
+compiles each list into one regex shaped like a trie of the patterns,
+which ``re`` scans in a single pass whatever the number of patterns.
+Only *whether* a pattern occurs matters, so matching stops at the
+shortest pattern that fits.
+
+Adapters build one ``LineFilters`` per class (``BaseAdapter.line_filters``).
+"""
+
+import re
+
+# Totals and separator rows ("-----", "=== ===") end a page's transactions
+_FOOTER_RE = re.compile(r"TOTAL|\A[-=_ ]{4,}\Z")
+
+
+def _trie_pattern(node):
+    if "" in node:
+        # A complete pattern ends here; longer ones add nothing
+        return ""
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items())]
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+def compile_substrings(substrings):
+    """
+    Return a compiled regex whose ``search()`` finds any of *substrings*,
+    or None if there are none.
+    """
+    trie = {}
+    for s in substrings:
+        if not s:
+            continue
+        node = trie
+        for ch in s:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    if not trie:
+        return None
+    return re.compile(_trie_pattern(trie))
+
+
+class LineFilters:
+    """
+    Compiled junk / footer / opening-balance checks for one adapter class.
+
+    *junk* are lowercase substrings matched against the lowercased line;
+    *opening_markers* are uppercase substrings matched against the
+    uppercased line.
+    """
+
+    def __init__(self, junk, opening_markers):
+        self._junk = compile_substrings(junk)
+        self._opening = compile_substrings(opening_markers)
+
+    def is_junk(self, line_lower):
+        return self._junk is not None and self._junk.search(line_lower) is not None
+
+    def is_footer(self, line_upper):
+        """TOTAL lines and separator rows (stripped line only)."""
+        return _FOOTER_RE.search(line_upper) is not None
+
+    def is_opening_balance(self, line_upper):
+        return self._opening is not None and self._opening.search(line_upper) is not None
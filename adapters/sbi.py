@@ -42,8 +42,8 @@ class SBIAdapter(GenericAdapter):
             "address ",
         ]
 
-    def is_opening_balance(self, line_upper):
-        return "BALANCE AS ON" in line_upper
+    def opening_balance_markers(self):
+        return ["BALANCE AS ON"]
 
     def parse_date_and_text(self, clean_line):
         """
@@ -72,8 +72,8 @@ class SBIAdapter(GenericAdapter):
 
     # ── Context ────────────────────────────────────────────────────────
 
-    def build_context(self, pdf_path):
-        context = super().build_context(pdf_path)
+    def build_context(self, source):
+        context = super().build_context(source)
         context["bank"] = "SBI"
         context["confidence"]["bank"] = 1.0
         # Clean (cid:N) artefacts from account holder name
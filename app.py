@@ -1,6 +1,5 @@
 import streamlit as st
 import os
-import shutil
 import zipfile
 from io import BytesIO
 
@@ -26,90 +25,52 @@ st.markdown("""
 
 # --- 2. IMPORTS (Project Modules) ---
 # Note: specific imports from your project structure
-from parser.context_builder import build_statement_context
-from parser.account_holder import extract_account_holder_name
-from parser.bank_detector import detect_bank
-from adapters import get_adapter
-from accounting.classifier import classify_transaction
-from accounting.journal_builder import build_journal_entry
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 
-# FIXED: Importing from 'writers' folder as per our fix
-from writers.journal_pdf import generate_journal_pdf
-from writers.tally_excel import generate_tally_excel
+from parser.result_cache import DEFAULT_MAX_BYTES
+from pipeline import process_upload
 
 # --- 3. CONFIGURATION ---
-INPUT_DIR = "temp_input"
-OUTPUT_DIR = "temp_output"
-
-def reset_folders():
-    """Clears folders for a fresh run to prevent mixing data."""
-    if os.path.exists(INPUT_DIR):
-        shutil.rmtree(INPUT_DIR)
-    if os.path.exists(OUTPUT_DIR):
-        shutil.rmtree(OUTPUT_DIR)
-    os.makedirs(INPUT_DIR)
-    os.makedirs(OUTPUT_DIR)
-
-def process_file(pdf_path, filename):
-    """
-    The Core Logic:
-    1. Detect Bank
-    2. Parse PDF
-    3. Classify Transactions (inc. Utility vs Credit Card logic)
-    4. Generate PDF & Excel
-    """
-    try:
-        # A. Detect Bank & Build Context
-        bank = detect_bank(pdf_path)
-        if not bank:
-            return None, "Could not detect bank (Only JKB, HDFC, SBI supported)."
-            
-        adapter = get_adapter(bank)
-        context = adapter.build_context(pdf_path)
-        
-        # B. Get Account Holder Name
-        account_holder = extract_account_holder_name(pdf_path)
-
-        # C. Process Transactions
-        entries = []
-        for txn in context["transactions"]:
-            # Skip opening balance rows
-            if txn["date"] == "OPENING":
-                continue
-            
-            # Classify (Purchase vs General Expense vs Sales)
-            ttype = classify_transaction(txn)
-            
-            # Build Journal Entry
-            entry = build_journal_entry(txn, ttype)
-            entries.append(entry)
+# Uploads and outputs stay in memory; nothing is written to disk except
+# the parsed-statement cache, so sessions never share files.
+CACHE_DIR = ".cache/results"      # Parsed statements, reused on re-upload
+CACHE_MAX_BYTES = DEFAULT_MAX_BYTES
 
-        if not entries:
-            return None, "No valid transactions found in statement."
+# Statements processed at once across ALL sessions of this server.
+# Extra uploads wait in the pool's queue instead of oversubscribing the CPU.
+APP_WORKERS = int(os.environ.get("APP_WORKERS", os.cpu_count() or 1))
 
-        # D. Generate Outputs
-        stem = os.path.splitext(filename)[0]
-        journal_name = f"{stem} Journal.pdf"
-        tally_name = f"{stem} Tally.xlsx"
-        
-        journal_path = os.path.join(OUTPUT_DIR, journal_name)
-        tally_path = os.path.join(OUTPUT_DIR, tally_name)
+@st.cache_resource
+def get_worker_pool():
+    """
+    One bounded process pool shared by every session (parsing is
+    CPU-bound pure Python, so threads would serialize on the GIL).
+    'spawn' avoids forking Streamlit's threads into the workers.
+    """
+    return ProcessPoolExecutor(
+        max_workers=APP_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
 
-        # Generate the files using your 'writers' scripts
-        generate_journal_pdf(entries, journal_path, account_holder)
-        generate_tally_excel(entries, tally_path)
-        
-        return {
-            "bank": bank,
-            "holder": account_holder,
-            "journal_path": journal_path,   # Full path for reading
-            "tally_path": tally_path,       # Full path for reading
-            "journal_name": journal_name,   # Filename for download
-            "tally_name": tally_name        # Filename for download
-        }, None
-
-    except Exception as e:
-        return None, str(e)
+def submit_uploads(files):
+    """
+    Submit every upload to the shared pool; returns ``{future: index}``.
+    A pool broken by a dead worker process stays broken, so it is
+    dropped from the resource cache and rebuilt once before giving up.
+    """
+    for attempt in range(2):
+        pool = get_worker_pool()
+        try:
+            return {
+                pool.submit(process_upload, f.getvalue(), f.name, CACHE_DIR, CACHE_MAX_BYTES): i
+                for i, f in enumerate(files)
+            }
+        except BrokenProcessPool:
+            get_worker_pool.clear()
+            if attempt:
+                raise
 
 # --- 4. THE UI LAYOUT ---
 
@@ -130,66 +91,78 @@ uploaded_files = st.file_uploader("Upload Statements (PDF)", type="pdf", accept_
 # Process Button
 if uploaded_files:
     if st.button(f"Process {len(uploaded_files)} Statements"):
-        reset_folders()
-        
-        results = []
         progress_bar = st.progress(0)
         status_text = st.empty()
-        
-        for i, uploaded_file in enumerate(uploaded_files):
-            status_text.text(f"Processing {uploaded_file.name}...")
-            
-            # Save uploaded file to disk temporarily
-            file_path = os.path.join(INPUT_DIR, uploaded_file.name)
-            with open(file_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            
-            # Run the logic
-            data, error = process_file(file_path, uploaded_file.name)
-            
+        status_text.text(f"Processing {len(uploaded_files)} statements...")
+
+        # Submit the whole batch to the shared pool (each upload is
+        # processed in memory by pipeline.process_upload); results arrive
+        # in completion order and the progress bar follows them.
+        try:
+            futures = submit_uploads(uploaded_files)
+        except BrokenProcessPool:
+            st.error("❌ The processing workers could not be started. Please try again in a moment.")
+            st.stop()
+        results = [None] * len(uploaded_files)
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            uploaded_file = uploaded_files[futures[future]]
+            try:
+                data, error = future.result()
+            except BrokenProcessPool as e:
+                # A worker process died; the next batch gets a new pool
+                get_worker_pool.clear()
+                data, error = None, str(e)
+            except Exception as e:
+                data, error = None, str(e)
+
             if error:
                 st.error(f"❌ Error in {uploaded_file.name}: {error}")
             else:
-                results.append(data)
+                results[futures[future]] = data
                 # Success Message
                 st.success(f"✅ {data['holder']} ({data['bank']}) - Processed Successfully")
-            
+
             # Update Progress
-            progress_bar.progress((i + 1) / len(uploaded_files))
-        
+            progress_bar.progress(done / len(uploaded_files))
+            status_text.text(f"Processed {done}/{len(uploaded_files)}: {uploaded_file.name}")
+
         status_text.text("Processing Complete!")
 
-        # --- DOWNLOAD SECTION ---
-        if results:
-            st.divider()
-            st.subheader("📥 Download Results")
+        # Keep this session's results (in upload order) so the download
+        # buttons below survive the rerun triggered by clicking them.
+        st.session_state["results"] = [r for r in results if r]
+
+    # --- DOWNLOAD SECTION ---
+    results = st.session_state.get("results", [])
+    if results:
+        st.divider()
+        st.subheader("📥 Download Results")
+        
+        # OPTION 1: Download All as ZIP
+        if len(results) > 1:
+            zip_buffer = BytesIO()
+            with zipfile.ZipFile(zip_buffer, "w") as zf:
+                for res in results:
+                    zf.writestr(res["journal_name"], res["journal_data"])
+                    zf.writestr(res["tally_name"], res["tally_data"])
             
-            # OPTION 1: Download All as ZIP
-            if len(results) > 1:
-                zip_buffer = BytesIO()
-                with zipfile.ZipFile(zip_buffer, "w") as zf:
-                    for res in results:
-                        zf.write(res["journal_path"], res["journal_name"])
-                        zf.write(res["tally_path"], res["tally_name"])
-                
-                st.download_button(
-                    label="📦 Download All (ZIP)",
-                    data=zip_buffer.getvalue(),
-                    file_name="Processed_Statements.zip",
-                    mime="application/zip",
-                    type="primary"
-                )
-                st.write("---")
-
-            # OPTION 2: Individual Files
-            for res in results:
-                c1, c2, c3 = st.columns([2, 1, 1])
-                with c1:
-                    st.write(f"**{res['holder']}**")
-                with c2:
-                    with open(res["journal_path"], "rb") as f:
-                        st.download_button("📄 Journal PDF", f, file_name=res["journal_name"])
-                with c3:
-                    with open(res["tally_path"], "rb") as f:
-                        st.download_button("📊 Tally Excel", f, file_name=res["tally_name"])
+            st.download_button(
+                label="📦 Download All (ZIP)",
+                data=zip_buffer.getvalue(),
+                file_name="Processed_Statements.zip",
+                mime="application/zip",
+                type="primary"
+            )
+            st.write("---")
+
+        # OPTION 2: Individual Files
+        for res in results:
+            c1, c2, c3 = st.columns([2, 1, 1])
+            with c1:
+                st.write(f"**{res['holder']}**")
+            with c2:
+                st.download_button("📄 Journal PDF", res["journal_data"], file_name=res["journal_name"])
+            with c3:
+                st.download_button("📊 Tally Excel", res["tally_data"], file_name=res["tally_name"])
 
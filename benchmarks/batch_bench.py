@@ -0,0 +1,64 @@
+"""
+Benchmark the columnar batch API (accounting.batch) against per-row
+classify_transaction + build_journal_entry.
+
+    python -m benchmarks.batch_bench [--rows N] [--repeat R]
+
+The script fails if the two paths produce different journal entries.
+"""
+
+import argparse
+import random
+import timeit
+
+from accounting.batch import (
+    build_journal_frame,
+    journal_entries_from_frame,
+    transactions_frame,
+)
+from accounting.classifier import classify_transaction
+from accounting.journal_builder import build_journal_entry
+from benchmarks.classifier_bench import synthetic_transactions
+
+
+def synthetic_statement(n, seed=0):
+    rng = random.Random(seed)
+    txns = synthetic_transactions(n, seed)
+    for i, txn in enumerate(txns):
+        txn["date"] = f"{i % 28 + 1:02d}/{i // 28 % 12 + 1:02d}/2024"
+        txn["amount"] = round(rng.uniform(1, 100_000), 2)
+        txn["balance"] = 0.0
+    return txns
+
+
+def per_row(txns):
+    return [build_journal_entry(t, classify_transaction(t)) for t in txns]
+
+
+def batch(txns):
+    return journal_entries_from_frame(build_journal_frame(transactions_frame(txns)))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    txns = synthetic_statement(args.rows)
+    if per_row(txns) != batch(txns):
+        raise SystemExit("batch journal differs from per-row journal")
+
+    row_t = min(timeit.repeat(lambda: per_row(txns), number=1, repeat=args.repeat))
+    batch_t = min(timeit.repeat(lambda: batch(txns), number=1, repeat=args.repeat))
+    frame = transactions_frame(txns)
+    core_t = min(timeit.repeat(lambda: build_journal_frame(frame), number=1, repeat=args.repeat))
+
+    print(f"rows:                 {args.rows}")
+    print(f"per-row:              {row_t:.3f}s")
+    print(f"batch (rows->rows):   {batch_t:.3f}s  ({row_t / batch_t:.2f}x)")
+    print(f"batch (frame->frame): {core_t:.3f}s  ({row_t / core_t:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
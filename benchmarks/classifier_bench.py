@@ -0,0 +1,111 @@
+"""
+Benchmark accounting.classifier.classify_transaction against the
+original per-call implementation (kept below as the reference).
+
+    python -m benchmarks.classifier_bench [--rows N] [--repeat R]
+
+Both classifiers are run over the same synthetic descriptions; the
+script fails if they disagree on any row.
+"""
+
+import argparse
+import random
+import re
+import timeit
+
+from accounting.classifier import classify_transaction
+
+# Typical fragments seen in JKB / SBI / HDFC narrations
+_FRAGMENTS = [
+    "TO TRANSFER-UPI/DR/412345678901/RAHUL KUMAR/YESB/rahul@ybl",
+    "BY TRANSFER-NEFT*HDFC0001234*ABC TRADERS",
+    "MTFR 0012 JAKAH24096019 TAWAKKAL",
+    "IMPS/P2A/123456/SHARMA STORES",
+    "SMS CHARGES FOR QTR", "NEFT CHARGES GST", "CIBIL FEE", "LOAN RECOVERY",
+    "JIO PREPAID RECHARGE 9876543210", "AIRTEL POSTPAID BILLPAY", "KPDCL BILL",
+    "GST ON CHARGES", "STATEMENT PRINTING CHARGES", "INT.COLL 123",
+    "INTEREST CREDITED", "Interest Rate 10%", "CDR CASH DEPOSIT",
+    "BY CASH DEPOSIT SELF", "MBILL CREDIT CARD", "RANDOM PARTY NAME 123456",
+]
+
+
+def classify_transaction_reference(txn):
+    """The classifier as it was before the rule tables were precompiled."""
+    desc = txn["description"].lower()
+    direction = txn.get("direction")
+
+    expense_keywords = [
+        "pdd", "jkpdd", "kpdcl", "electricity",
+        "jio", "airtel", "bsnl", "vi ", "vodafone",
+        "recharge", "prepaid", "postpaid", "billpay"
+    ]
+    if any(k in desc for k in expense_keywords):
+        return "general_expense"
+
+    if "gst" in desc:
+        return "gst"
+    if "loan" in desc:
+        return "loan"
+    if "printing" in desc or "statement pr" in desc:
+        return "printing"
+
+    charge_keywords = ["sms", "cibil", "fee", "inspc", "commissio", "charge", "chrg", "recovery"]
+    if any(x in desc for x in charge_keywords):
+        if "recharge" in desc:
+            pass
+        else:
+            return "bank_charges"
+
+    is_transfer = any(x in desc for x in ["mtfr", "neft", "rtgs", "upi", "imps", "trf", "by cash", "mbill", "ebil"])
+    if not is_transfer:
+        if re.search(r"\binterest\b", desc) or "int.coll" in desc or "i nt.coll" in desc:
+            return "interest"
+
+    if direction == "credit":
+        return "sales"
+    if direction == "debit":
+        return "purchase"
+    if is_transfer or "deposit" in desc:
+        return "sales"
+    return "purchase"
+
+
+def synthetic_transactions(n, seed=0):
+    rng = random.Random(seed)
+    txns = []
+    for _ in range(n):
+        desc = " ".join(rng.sample(_FRAGMENTS, rng.choice([1, 1, 1, 2])))
+        txns.append({
+            "description": desc,
+            "direction": rng.choice(["debit", "credit", None]),
+        })
+    return txns
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    txns = synthetic_transactions(args.rows)
+
+    expected = [classify_transaction_reference(t) for t in txns]
+    actual = [classify_transaction(t) for t in txns]
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    if mismatches:
+        raise SystemExit(f"{mismatches} rows classified differently")
+
+    def best(fn):
+        return min(timeit.repeat(lambda: [fn(t) for t in txns], number=1, repeat=args.repeat))
+
+    ref = best(classify_transaction_reference)
+    new = best(classify_transaction)
+    print(f"rows:       {args.rows}")
+    print(f"reference:  {ref:.3f}s  ({ref / args.rows * 1e6:.2f} us/row)")
+    print(f"compiled:   {new:.3f}s  ({new / args.rows * 1e6:.2f} us/row)")
+    print(f"speedup:    {ref / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
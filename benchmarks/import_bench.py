@@ -0,0 +1,99 @@
+"""
+Measure the import (startup) cost of each entry point with
+``python -X importtime``.
+
+    python -m benchmarks.import_bench [--repeat R] [--top K] [--json FILE]
+                                      [--module M ...]
+
+Each module is imported in a fresh interpreter R times; the median
+cumulative import time is reported, with the K most expensive imports of
+the median run.  ``--json`` writes the numbers out so they can be
+compared between commits.  The interpreter's own startup (``site``) is
+reported separately and not counted.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# What the CLI, the web app's pool workers and the job service import
+# before doing any work.
+ENTRY_POINTS = ["main", "pipeline", "jobs.worker", "jobs.server"]
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module):
+    """
+    Import *module* in a fresh interpreter.  Returns ``{name: cumulative
+    microseconds}`` for the top-level imports (*module* and ``site``)
+    and for every direct import made by *module*.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    children = {}
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", with
+        # the package indented two spaces per nesting level.  Children
+        # are listed before their parent.
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            times[name.strip()] = int(cumulative)
+            if name.strip() == module:
+                times.update(children)
+            children = {}
+        elif depth == 1:
+            children[name.strip()] = int(cumulative)
+    return times
+
+
+def measure(module, repeat):
+    runs = [import_times(module) for _ in range(repeat)]
+    totals = [r.get(module, 0) for r in runs]
+    median_run = sorted(runs, key=lambda r: r.get(module, 0))[len(runs) // 2]
+    return {
+        "module": module,
+        "median_us": int(statistics.median(totals)),
+        "min_us": min(totals),
+        "site_us": int(statistics.median(r.get("site", 0) for r in runs)),
+        "heaviest": sorted(
+            ((name, us) for name, us in median_run.items() if name not in (module, "site")),
+            key=lambda item: -item[1],
+        ),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=5)
+    ap.add_argument("--json", help="also write the results to this file")
+    ap.add_argument("--module", action="append", help="entry point(s) to measure")
+    args = ap.parse_args()
+
+    results = [measure(m, args.repeat) for m in args.module or ENTRY_POINTS]
+
+    for r in results:
+        print(f"{r['module']:<14} {r['median_us'] / 1000:8.1f} ms  "
+              f"(min {r['min_us'] / 1000:.1f} ms, site {r['site_us'] / 1000:.1f} ms)")
+        for name, us in r["heaviest"][:args.top]:
+            print(f"    {us / 1000:8.1f} ms  {name}")
+
+    if args.json:
+        for r in results:
+            r["heaviest"] = r["heaviest"][:args.top]
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark accounting.ledger_store.LedgerStore on a synthetic client with
+three bank accounts.
+
+    python -m benchmarks.ledger_bench [--rows 1000000] [--transfers 0.05]
+
+Entries are generated lazily (classified and journaled like the real
+pipeline) and streamed into the store.  A fraction of them are transfers
+between two of the accounts, written to both statements, marked either
+"SELF" or with the other account's last 4 digits.  The rest are ordinary
+UPI / NEFT / IMPS / cash entries drawn from the same small set of
+amounts, so unrelated entries of two accounts collide on amount and
+date all the time.  The script fails if any ordinary entry is merged;
+the few genuine pairs left apart (another transfer with the same amount
+a day away took the match) are reported.
+
+Generation is timed on its own and subtracted from the build time, and
+a second build runs under tracemalloc (skip with --no-memory), so the
+memory reported is the store's own footprint.  Then a few typical
+queries are timed.
+"""
+
+import argparse
+import datetime
+import random
+import time
+import timeit
+import tracemalloc
+
+from accounting.classifier import classify_transaction
+from accounting.journal_builder import build_journal_entry
+from accounting.ledger_store import LedgerStore
+
+ACCOUNTS = [("SBI", "00000012345678901"), ("JKB", "0123040100001234"), ("HDFC", "50100012345678")]
+
+FIRST_DAY = datetime.date(2024, 4, 1)
+DAYS = 365
+
+# Amounts shared by transfers and ordinary entries (~10k distinct)
+AMOUNTS = range(10_000, 500_001, 5_000)   # paise, before the paise part
+
+
+def _amount(rng):
+    return (rng.choice(AMOUNTS) + rng.randrange(100)) / 100
+
+# Transfer-looking, but paid to / received from someone else
+ORDINARY = [
+    "TO TRANSFER-UPI/DR/{ref}/SWIGGY/YESB/swiggy@ybl",
+    "BY TRANSFER-UPI/CR/{ref}/RAHUL KUMAR/SBIN/rahul@sbi",
+    "NEFT*HDFC0001234*{ref}*ACME SUPPLIERS",
+    "IMPS/P2A/{ref}/SHARMA STORES",
+    "BY CASH DEPOSIT",
+    "MTFR {ref} TAWAKKAL TRADERS",
+    "SMS CHARGES FOR QTR",
+]
+
+
+def _date(day):
+    return (FIRST_DAY + datetime.timedelta(days=day)).strftime("%d/%m/%Y")
+
+
+def _entry(description, amount, direction, day):
+    txn = {
+        "date": _date(day), "description": description,
+        "amount": amount, "balance": 0.0, "direction": direction,
+    }
+    return build_journal_entry(txn, classify_transaction(txn))
+
+
+def _transfers(rows, share, seed):
+    """``{(account, day): [entry]}`` for both sides of every own-account transfer."""
+    rng = random.Random(seed)
+    sides = {}
+    for i in range(int(rows * share / 2)):
+        day = rng.randrange(DAYS)
+        amount = _amount(rng)
+        src, dst = rng.sample(range(len(ACCOUNTS)), 2)
+        ref = rng.randrange(10**12)
+        if i % 2:
+            out = f"TO TRANSFER-NEFT*SELF*OWN ACCOUNT {ref}"
+            into = f"BY TRANSFER-NEFT*SELF*OWN ACCOUNT {ref}"
+        else:
+            out = f"NEFT/{ref}/TO A/C XX{ACCOUNTS[dst][1][-4:]}"
+            into = f"NEFT/{ref}/FROM A/C XX{ACCOUNTS[src][1][-4:]}"
+        sides.setdefault((src, day), []).append(_entry(out, amount, "debit", day))
+        sides.setdefault((dst, day), []).append(_entry(into, amount, "credit", day))
+    return sides
+
+
+def _is_transfer_side(entry):
+    return "SELF" in entry["narration"] or " XX" in entry["narration"]
+
+
+def statement(account, rows, transfers, seed):
+    """Yield one account's entries in date order, transfer sides included."""
+    rng = random.Random(seed * 31 + account)
+    last_day = -1
+    for i in range(rows):
+        day = i * DAYS // rows
+        for d in range(last_day + 1, day + 1):
+            yield from transfers.get((account, d), ())
+        last_day = day
+        # A reference number makes most narrations distinct, as in real data
+        description = rng.choice(ORDINARY).format(ref=rng.randrange(10**12))
+        yield _entry(description, _amount(rng), rng.choice(["debit", "credit"]), day)
+    for d in range(last_day + 1, DAYS):
+        yield from transfers.get((account, d), ())
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=1_000_000, help="entries across all accounts")
+    ap.add_argument("--transfers", type=float, default=0.05, help="share of entries that are own-account transfers")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc build")
+    args = ap.parse_args()
+
+    transfers = _transfers(args.rows, args.transfers, seed=1)
+    pairs = sum(len(v) for v in transfers.values()) // 2
+    per_account = (args.rows - 2 * pairs) // len(ACCOUNTS)
+
+    def statements():
+        for account, (bank, number) in enumerate(ACCOUNTS):
+            yield statement(account, per_account, transfers, seed=0), bank, number
+
+    def build():
+        store = LedgerStore()
+        for entries, bank, number in statements():
+            store.add_statement(entries, bank, number)
+        return store
+
+    start = time.perf_counter()
+    entries = sum(sum(1 for _ in entries) for entries, _, _ in statements())
+    generate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store = build()
+    ingest = time.perf_counter() - start - generate
+
+    # Every ordinary entry kept as it was; merges only between transfer sides
+    banks = {ledger for _, _, ledger in store.accounts()}
+    rows = store.query()
+    contras = [e for e in rows if e["debit"] in banks and e["credit"] in banks]
+    sides_left = sum(1 for e in rows if _is_transfer_side(e) and e not in contras)
+    ordinary = sum(1 for e in rows if not _is_transfer_side(e))
+    if ordinary != entries - 2 * pairs or any(not _is_transfer_side(e) for e in contras):
+        raise SystemExit(f"ordinary entries were merged: {entries - 2 * pairs - ordinary:,} missing")
+    if len(contras) != store.transfers_merged or 2 * len(contras) + sides_left != 2 * pairs:
+        raise SystemExit("merge count does not add up")
+
+    print(f"entries in:     {entries:,} ({pairs:,} transfer pairs)")
+    print(f"rows stored:    {len(store):,} ({store.transfers_merged:,} merged, none coincidental, "
+          f"{pairs - store.transfers_merged:,} pairs left ambiguous)")
+    print(f"ingest:         {ingest:.2f}s ({entries / ingest:,.0f} entries/s, generation excluded)")
+
+    if not args.no_memory:
+        del store
+        tracemalloc.start()
+        store = build()
+        traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"memory:         {traced / 2**20:.1f} MiB ({traced / len(store):.0f} bytes/row)")
+
+    q2 = (datetime.date(2024, 7, 1), datetime.date(2024, 9, 30))
+    queries = {
+        "Purchase A/c, Q2": lambda: store.query("Purchase A/c", *q2),
+        "all entries, one day": lambda: store.query(start=datetime.date(2024, 8, 15), end=datetime.date(2024, 8, 15)),
+        "counterparty": lambda: store.query(counterparty="SWIGGY"),
+        "SBI bank ledger, Q2": lambda: store.query(store.accounts()[0][2], *q2),
+        "ledger totals, Q2": lambda: store.totals(*q2),
+    }
+    print()
+    for name, fn in queries.items():
+        seconds = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"  {name:<22} {len(fn()):>9,} results  {seconds * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark the right-scan fast path of parser.row_normalizer against the
+previous findall / str.replace parsing.
+
+    python -m benchmarks.normalizer_bench [--rows 200000] [--repeat 5]
+
+Rows mostly look like real statement lines ("<description> <amount>
+<balance> Cr"), mixed with the shapes the fast path hands back to the
+regex: amounts inside the description, text after the balance, missing
+tags, "Dr"/"Cr" inside words, quotes, and randomly spliced fragments.
+Every row must come out exactly as the reference parses it, and
+one-paisa balance movements must still get a direction.
+"""
+
+import argparse
+import random
+import timeit
+
+from benchmarks.classifier_bench import _FRAGMENTS
+from parser.row_normalizer import (
+    AMOUNT_RE,
+    OPENING_RE,
+    _paise,
+    _scan_tail,
+    normalize_transactions,
+)
+from records import Transaction
+
+
+def normalize_transactions_reference(raw_txns):
+    """The normalizer before the fast path: last findall match, str.replace cleanup."""
+    out = []
+    previous_balance = None
+    for txn in raw_txns:
+        if txn["date"] == "OPENING":
+            match = OPENING_RE.search(txn["text"])
+            if match:
+                val = _paise(match.group(1))
+                dr_cr = match.group(2) or ""
+                previous_balance = -val if "DR" in dr_cr.upper() else val
+            continue
+
+        matches = AMOUNT_RE.findall(txn["text"])
+        if not matches:
+            continue
+        last_match = matches[-1]
+        amount = _paise(last_match[0])
+        balance_abs = _paise(last_match[1])
+        dr_cr_tag = last_match[2].strip() if last_match[2] else ""
+        current_balance = -balance_abs if "DR" in dr_cr_tag.upper() else balance_abs
+
+        direction = None
+        if previous_balance is not None:
+            delta = current_balance - previous_balance
+            if delta > 0:
+                direction = "credit"
+            elif delta < 0:
+                direction = "debit"
+
+        clean_desc = txn["text"]
+        for part in last_match[:2]:
+            clean_desc = clean_desc.replace(part, "")
+        if dr_cr_tag:
+            clean_desc = clean_desc.replace(dr_cr_tag, "")
+        clean_desc = clean_desc.replace('"', '').strip()
+
+        previous_balance = current_balance
+        out.append(Transaction(txn["date"], clean_desc, amount, current_balance, direction))
+    return out
+
+
+_ODD_PIECES = [
+    "CHQ 1,000.00", "Dr. SHARMA", "Crompton", "dr", "cr", "CR", '"', ".", ",", "500.00",
+    "REF 12.34.56", "1.5", "  ", "\t", "00", "Cr.", "12.12.", "TOTAL",
+]
+
+
+# (rows, expected directions): a balance moving by a single paisa
+_ONE_PAISA_CASES = [
+    (["BALANCE B/F 0.50 Cr", "UPI FEE 0.01 0.49 Cr"], ["debit"]),
+    (["BALANCE B/F 0.49 Cr", "INT CREDIT 0.01 0.50 Cr"], ["credit"]),
+    (["BALANCE B/F 0.00 Cr", "ROUND OFF 0.01 0.01 Dr"], ["debit"]),
+    (["BALANCE B/F 0.01 Dr", "ROUND OFF 0.01 0.00 Cr"], ["credit"]),
+    (["BALANCE B/F 1,000.00 Cr", "REVERSAL 0.00 1,000.00 Cr", "CHARGES 0.01 999.99 Cr"],
+     [None, "debit"]),
+]
+
+
+def check_one_paisa():
+    for texts, expected in _ONE_PAISA_CASES:
+        rows = [{"date": "OPENING", "text": texts[0]}]
+        rows += [{"date": "01/04/2024", "text": t} for t in texts[1:]]
+        directions = [t["direction"] for t in normalize_transactions(rows)]
+        if directions != expected:
+            raise SystemExit(f"{texts}: directions {directions}, expected {expected}")
+
+
+def _money(rng, large):
+    value = rng.randrange(10**11 if large else 10**7)
+    return f"{value // 100:,}.{value % 100:02d}"
+
+
+def statement_rows(n, seed=0):
+    rng = random.Random(seed)
+    balance = 10**9
+    rows = [{"date": "OPENING", "text": f"BALANCE B/F {balance // 100:,}.{balance % 100:02d} Cr"}]
+    for i in range(n):
+        desc = f"{rng.choice(_FRAGMENTS)} {rng.randrange(10**6)}"
+        paise = rng.randrange(1, 10**7)
+        balance += rng.choice([paise, -paise])
+        amount = f"{paise // 100:,}.{paise % 100:02d}"
+        bal = f"{abs(balance) // 100:,}.{abs(balance) % 100:02d}"
+        tag = "Cr" if balance >= 0 else "Dr"
+        shape = rng.random()
+        if shape < 0.80:
+            text = f"{desc} {amount} {bal} {tag}"
+        elif shape < 0.85:
+            text = f"{desc} {amount} {bal}"
+        elif shape < 0.90:
+            text = f"{desc} {rng.choice(_ODD_PIECES)} {amount} {bal} {tag.upper()}"
+        elif shape < 0.95:
+            text = f"{desc} {amount} {bal} {tag} {rng.choice(_ODD_PIECES)}"
+        else:
+            # Fuzz: splice fragments, amounts and tags in random order
+            pieces = [desc, amount, bal, tag, _money(rng, rng.random() < 0.5)]
+            pieces += rng.sample(_ODD_PIECES, 3)
+            rng.shuffle(pieces)
+            text = rng.choice(["", " ", "\t"]).join(pieces)
+        rows.append({"date": f"{i % 28 + 1:02d}/{i // 28 % 12 + 1:02d}/2024", "text": text})
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    check_one_paisa()
+    rows = statement_rows(args.rows)
+    expected = normalize_transactions_reference(rows)
+    actual = normalize_transactions(rows)
+    if len(actual) != len(expected):
+        raise SystemExit(f"{len(actual)} rows parsed, reference parsed {len(expected)}")
+    mismatches = [(r, a, e) for r, a, e in zip(rows[1:], actual, expected) if a != e]
+    if mismatches:
+        raw, a, e = mismatches[0]
+        raise SystemExit(f"{len(mismatches)} rows differ, e.g. {raw['text']!r}:\n  {a}\n  {e}")
+
+    fast = sum(1 for r in rows[1:] if _scan_tail(r["text"]) is not None)
+
+    def best(fn):
+        return min(timeit.repeat(lambda: fn(rows), number=1, repeat=args.repeat))
+
+    ref = best(normalize_transactions_reference)
+    new = best(normalize_transactions)
+    print(f"rows:       {args.rows:,} ({fast / args.rows:.0%} on the fast path)")
+    print(f"reference:  {ref:.3f}s  ({ref / args.rows * 1e6:.2f} us/row)")
+    print(f"right-scan: {new:.3f}s  ({new / args.rows * 1e6:.2f} us/row)")
+    print(f"speedup:    {ref / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Time every pipeline stage on synthetic statements for each bank adapter.
+
+    python -m benchmarks.pipeline_bench [--banks SBI,JKB,HDFC,GENERIC]
+        [--pages 10,100,1000] [--rows-per-page 25] [--out results.json]
+        [--pdf-dir DIR] [--no-memory]
+
+For every (bank, size) a statement is generated with
+``benchmarks.synthetic_statements`` (reused from --pdf-dir if it is
+already there), then the stages run one after another on it:
+
+    detect, extract, normalize, classify, journal, pdf_write, excel_write
+
+Each stage records wall time and throughput (pages/s for detect and
+extract, rows/s for the rest).  Unless --no-memory is given, the stages
+then run a second time under tracemalloc to record each one's peak
+Python memory; timing is taken from the first pass, since tracemalloc
+slows allocation-heavy code down.  Results go to --out as JSON, tagged
+with the current git commit, so runs can be compared between commits.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from accounting.classifier import classify_transaction
+from accounting.journal_builder import build_journal_entry
+from adapters import get_adapter
+from benchmarks.synthetic_statements import BANKS, make_statement
+from parser.account_holder import extract_account_holder_name
+from parser.bank_detector import detect_bank_with_method
+from parser.row_normalizer import normalize_transactions
+from parser.statement_document import StatementDocument
+from writers.journal_pdf import generate_journal_pdf
+from writers.tally_excel import generate_tally_excel
+
+STAGES = ["detect", "extract", "normalize", "classify", "journal", "pdf_write", "excel_write"]
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def statement_path(pdf_dir, bank, pages, rows_per_page):
+    """Generate (once) and return the synthetic statement for these settings."""
+    path = os.path.join(pdf_dir, f"{bank.lower()}-{pages}p-{rows_per_page}r.pdf")
+    if not os.path.exists(path):
+        tmp_path = f"{path}.tmp"
+        make_statement(tmp_path, bank, pages, rows_per_page)
+        os.replace(tmp_path, path)
+    return path
+
+
+def run_stages(pdf_path, on_stage):
+    """
+    Run the pipeline on *pdf_path*, calling ``on_stage(name, fn)`` for
+    each stage; *on_stage* must call ``fn()`` and return its result.
+    Returns ``(bank, pages, rows)``.
+    """
+    with StatementDocument(pdf_path) as doc:
+        def detect():
+            bank, _ = detect_bank_with_method(doc)
+            return bank, extract_account_holder_name(doc)
+
+        bank, holder = on_stage("detect", detect)
+        adapter = get_adapter(bank)
+
+        # Page text extraction + line grouping (the adapter's own work)
+        raw = on_stage("extract", lambda: adapter._extract_transactions(doc))
+        pages = doc.page_count
+
+    txns = on_stage("normalize", lambda: normalize_transactions(raw))
+    txns = [t for t in txns if t["date"] != "OPENING"]
+    types = on_stage("classify", lambda: [classify_transaction(t) for t in txns])
+    entries = on_stage(
+        "journal", lambda: [build_journal_entry(t, ty) for t, ty in zip(txns, types)]
+    )
+    on_stage("pdf_write", lambda: generate_journal_pdf(entries, io.BytesIO(), holder))
+    on_stage("excel_write", lambda: generate_tally_excel(entries, io.BytesIO()))
+    return bank, pages, len(entries)
+
+
+def benchmark(pdf_path, memory=True):
+    """Return ``{"bank", "pages", "rows", "stages": {name: {...}}}`` for one statement."""
+    stages = {}
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        stages[name] = {"seconds": time.perf_counter() - start}
+        return result
+
+    bank, pages, rows = run_stages(pdf_path, timed)
+
+    if memory:
+        def traced(name, fn):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            result = fn()
+            stages[name]["peak_bytes"] = tracemalloc.get_traced_memory()[1] - base
+            return result
+
+        tracemalloc.start()
+        try:
+            run_stages(pdf_path, traced)
+        finally:
+            tracemalloc.stop()
+
+    for name, stage in stages.items():
+        unit, count = ("pages", pages) if name in ("detect", "extract") else ("rows", rows)
+        stage["unit"] = unit
+        stage["per_second"] = count / stage["seconds"] if stage["seconds"] else None
+
+    return {"bank": bank, "pages": pages, "rows": rows, "stages": stages}
+
+
+def _print_result(layout, r):
+    print(f"{layout} ({r['bank']}): {r['pages']} pages, {r['rows']} rows")
+    for name in STAGES:
+        s = r["stages"][name]
+        rate = f"{s['per_second']:,.0f} {s['unit']}/s" if s["per_second"] else "-"
+        peak = f"{s['peak_bytes'] / 2**20:8.1f} MiB" if "peak_bytes" in s else ""
+        print(f"    {name:<12} {s['seconds']:8.3f}s  {rate:>18}  {peak}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--banks", default=",".join(BANKS))
+    ap.add_argument("--pages", default="10,100", help="comma-separated sizes (e.g. 10,100,1000,10000)")
+    ap.add_argument("--rows-per-page", type=int, default=25)
+    ap.add_argument("--out", default="pipeline_bench.json")
+    ap.add_argument("--pdf-dir", default=os.path.join(tempfile.gettempdir(), "statement-bench"))
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    args = ap.parse_args()
+
+    os.makedirs(args.pdf_dir, exist_ok=True)
+    results = []
+    for bank in [b.strip().upper() for b in args.banks.split(",") if b.strip()]:
+        for pages in [int(p) for p in args.pages.split(",") if p.strip()]:
+            pdf_path = statement_path(args.pdf_dir, bank, pages, args.rows_per_page)
+            r = benchmark(pdf_path, memory=not args.no_memory)
+            r["layout"] = bank
+            _print_result(bank, r)
+            results.append(r)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rows_per_page": args.rows_per_page,
+            "results": results,
+        }, f, indent=2)
+    print(f"\nwrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
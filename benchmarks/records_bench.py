@@ -0,0 +1,91 @@
+"""
+Memory of normalized transactions and journal entries as records vs dicts.
+
+    python -m benchmarks.records_bench [--rows 100000]
+
+Synthetic raw rows (``{date, text}``, as the adapters group them) are
+normalized and journaled, and both generations are kept alive, as
+``build_context`` and the output stage do.  This is done once with the
+``records.Transaction`` / ``records.JournalEntry`` rows the pipeline now
+produces, and once converted to the plain dicts it used to produce; the
+two must hold the same values.
+
+Memory is what tracemalloc sees retained after each build (narrations
+are warmed up first, so their cache is not charged to either side);
+descriptions and narrations are the same strings in both, so the
+difference is the per-row containers and amount objects.
+"""
+
+import argparse
+import random
+import sys
+import tracemalloc
+
+from accounting.journal_builder import iter_journal_entries
+from benchmarks.classifier_bench import _FRAGMENTS
+from parser.row_normalizer import iter_normalized_transactions
+
+
+def raw_rows(n, seed=0):
+    rng = random.Random(seed)
+    balance = 1_000_000.0
+    rows = [{"date": "OPENING", "text": f"OPENING BALANCE {balance:,.2f} Cr"}]
+    for i in range(n):
+        amount = round(rng.uniform(1, 50_000), 2)
+        balance = round(balance + rng.choice([amount, -amount]), 2)
+        desc = f"{rng.choice(_FRAGMENTS)} {rng.randrange(10**6)}"
+        rows.append({
+            "date": f"{i % 28 + 1:02d}/{i // 28 % 12 + 1:02d}/2024",
+            "text": f"{desc} {amount:,.2f} {abs(balance):,.2f} {'Cr' if balance >= 0 else 'Dr'}",
+        })
+    return rows
+
+
+def as_records(raw):
+    transactions = list(iter_normalized_transactions(raw))
+    return transactions, list(iter_journal_entries(transactions))
+
+
+def as_dicts(raw):
+    transactions = [dict(t) for t in iter_normalized_transactions(raw)]
+    return transactions, [dict(e) for e in iter_journal_entries(transactions)]
+
+
+def retained(build, raw):
+    tracemalloc.start()
+    result = build(raw)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--rows", type=int, default=100_000)
+    args = ap.parse_args()
+
+    raw = raw_rows(args.rows)
+    txns, entries = as_records(raw)
+    dict_txns, dict_entries = as_dicts(raw)
+    if [dict(t) for t in txns] != dict_txns or [dict(e) for e in entries] != dict_entries:
+        raise SystemExit("records and dicts hold different values")
+    sizes = {
+        "transaction": (sys.getsizeof(txns[0]), sys.getsizeof(dict_txns[0])),
+        "journal entry": (sys.getsizeof(entries[0]), sys.getsizeof(dict_entries[0])),
+    }
+    del txns, entries, dict_txns, dict_entries
+
+    mem = {name: retained(build, raw) for name, build in (("records", as_records), ("dicts", as_dicts))}
+
+    print(f"rows:           {args.rows:,}")
+    for name, (record, plain) in sizes.items():
+        print(f"{name + ':':<15} {record} bytes as a record, {plain} as a dict (object only)")
+    for name in ("records", "dicts"):
+        print(f"{name + ':':<15} {mem[name] / 2**20:7.1f} MiB retained ({mem[name] / args.rows:.0f} bytes/row)")
+    print(f"saving:         {(mem['dicts'] - mem['records']) / 2**20:.1f} MiB "
+          f"({1 - mem['records'] / mem['dicts']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
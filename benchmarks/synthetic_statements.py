@@ -0,0 +1,179 @@
+"""
+Generate synthetic bank statement PDFs in each supported bank's layout.
+
+    python -m benchmarks.synthetic_statements --bank SBI --pages 100 out.pdf
+
+Layouts follow what the adapters are written against:
+
+``SBI``
+    "Account Name :" header, column headers on every page, "Balance as
+    on" opening row, double-date rows (txn date + value date) with the
+    amount / balance on a continuation line, computer-generated footer.
+``JKB``
+    "TO:" address block with a pincode line, a B/F row at the top of
+    every page, single-date rows ending in Cr/Dr, a TOTAL line and the
+    discrepancy disclaimer at the bottom.
+``HDFC``
+    "M/S." holder line, an opening balance row, DD/MM/YY rows.
+``GENERIC``
+    No bank name at all (detected as UNKNOWN, parsed by GenericAdapter).
+
+Descriptions longer than one line wrap onto continuation lines, so
+multi-line transactions are exercised everywhere.
+"""
+
+import argparse
+import random
+
+BANKS = ("SBI", "JKB", "HDFC", "GENERIC")
+
+# Narrations covering every classifier branch (and long enough to wrap)
+_DESCRIPTIONS = [
+    "TO TRANSFER-UPI/DR/412345678901/RAHUL KUMAR/YESB/rahul@ybl/PAYMENT",
+    "BY TRANSFER-NEFT*HDFC0001234*ABC TRADERS PVT LTD",
+    "MTFR 0012 JAKAH24096019 TAWAKKAL",
+    "IMPS/P2A/123456/SHARMA STORES",
+    "SMS CHARGES FOR QTR", "NEFT CHARGES GST", "CIBIL FEE", "LOAN RECOVERY",
+    "JIO PREPAID RECHARGE 9876543210", "AIRTEL POSTPAID BILLPAY", "KPDCL BILL",
+    "GST ON CHARGES", "STATEMENT PRINTING CHARGES", "INT.COLL 123",
+    "INTEREST CREDITED", "CDR CASH DEPOSIT", "BY CASH DEPOSIT SELF",
+    "MBILL CREDIT CARD", "RANDOM PARTY NAME 123456",
+]
+
+HOLDER = "TEST TRADERS"
+
+_WRAP = 34          # characters of description on the first line
+_FONT_SIZE = 8
+_LINE_HEIGHT = 9
+
+
+def _transactions(rng, count, balance):
+    """Yield (description, amount, new_balance, is_credit) tuples."""
+    for _ in range(count):
+        amount = round(rng.uniform(10, 50_000), 2)
+        is_credit = rng.random() < 0.45
+        balance = round(balance + amount if is_credit else balance - amount, 2)
+        yield rng.choice(_DESCRIPTIONS), amount, balance, is_credit
+
+
+def _date(n, sep="/", year="2024"):
+    return f"{n % 28 + 1:02d}{sep}{n // 28 % 12 + 1:02d}{sep}{year}"
+
+
+def _page_lines(bank, page, rows, rng, state):
+    """Text lines of one statement page; *state* carries balance and day."""
+    lines = []
+    first = page == 0
+
+    if bank == "SBI":
+        lines += [
+            "STATE BANK OF INDIA",
+            f"Account Name : M/S. {HOLDER}, SRINAGAR",
+            "Account Number : 00000012345678901",
+            "Txn Date Value Date Description Ref No./Cheque Branch Debit Credit Balance",
+        ]
+        if first:
+            lines.append(f"Balance as on 01/04/2024 {state['balance']:,.2f}")
+    elif bank == "JKB":
+        lines += [
+            "THE JAMMU AND KASHMIR BANK LTD",
+            "TO:", f"MS.. {HOLDER}", "DALGATE SRINAGAR", "190001",
+            "Date Particulars Chq.No./Ref.No. Withdrawals Deposits Balance",
+            f"B/F {abs(state['balance']):,.2f} {'Cr' if state['balance'] >= 0 else 'Dr'}",
+        ]
+    elif bank == "HDFC":
+        lines += [
+            "HDFC BANK LIMITED",
+            f"M/S. {HOLDER}",
+            "Date Narration Chq./Ref.No. Value Dt Withdrawal Amt. Deposit Amt. Closing Balance",
+        ]
+        if first:
+            lines.append(f"OPENING BALANCE {state['balance']:,.2f}")
+    else:
+        lines += [
+            f"M/S. {HOLDER}",
+            "Date Description Amount Balance",
+        ]
+        if first:
+            lines.append(f"OPENING BALANCE {state['balance']:,.2f}")
+
+    for desc, amount, balance, _ in _transactions(rng, rows, state["balance"]):
+        n = state["day"]
+        state["day"] += 1
+        state["balance"] = balance
+        head, tail = desc[:_WRAP], desc[_WRAP:]
+
+        if bank == "SBI":
+            date = _date(n)
+            lines.append(f"{date} {date} {head}")
+            if tail:
+                lines.append(tail)
+            lines.append(f"  {amount:,.2f} {abs(balance):,.2f}")
+        elif bank == "JKB":
+            tag = "Cr" if balance >= 0 else "Dr"
+            lines.append(f"{_date(n, '-')} {head} {amount:,.2f} {abs(balance):,.2f} {tag}")
+            if tail:
+                lines.append(tail)
+        elif bank == "HDFC":
+            lines.append(f"{_date(n, '/', '24')} {head} {amount:,.2f} {abs(balance):,.2f}")
+            if tail:
+                lines.append(tail)
+        else:
+            lines.append(f"{_date(n, '-')} {head} {amount:,.2f} {abs(balance):,.2f}")
+            if tail:
+                lines.append(tail)
+
+    if bank == "SBI":
+        lines.append("**This is a computer generated statement and does not require a signature")
+    elif bank == "JKB":
+        lines += [
+            "TOTAL 1,000.00 2,000.00",
+            "Unless the constituent notifies the bank immediately of any discrepancy found",
+            "by him in this statement of account, it will be taken that he has found",
+            "the account correct",
+        ]
+    return lines
+
+
+def make_statement(output, bank, pages, rows_per_page=25, seed=0):
+    """
+    Write a *pages*-page synthetic *bank* statement to *output* (a path
+    or binary file-like object).  Returns the number of transactions.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    if bank not in BANKS:
+        raise ValueError(f"unknown bank layout: {bank!r} (expected one of {', '.join(BANKS)})")
+
+    rng = random.Random(seed)
+    state = {"balance": 100_000.00, "day": 0}
+    c = canvas.Canvas(output, pagesize=A4)
+    _, page_h = A4
+
+    for page in range(pages):
+        c.setFont("Helvetica", _FONT_SIZE)
+        y = page_h - 36
+        for line in _page_lines(bank, page, rows_per_page, rng, state):
+            c.drawString(30, y, line)
+            y -= _LINE_HEIGHT
+        c.showPage()
+    c.save()
+    return pages * rows_per_page
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("output")
+    ap.add_argument("--bank", choices=BANKS, default="SBI")
+    ap.add_argument("--pages", type=int, default=10)
+    ap.add_argument("--rows-per-page", type=int, default=25)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rows = make_statement(args.output, args.bank, args.pages, args.rows_per_page, args.seed)
+    print(f"{args.output}: {args.bank}, {args.pages} pages, {rows} transactions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+instrumentation
+~~~~~~~~~~~~~~~
+Per-stage timing, counting and memory tracking for one pipeline run.
+
+The CLI pipeline is streamed: extraction, normalization, classification
+and journaling are chained generators that all advance together, so a
+stage cannot simply be timed from start to finish.  ``StageRecorder``
+therefore keeps a stack of active stages (per thread) and charges every
+interval to the stage on top of it:
+
+* ``recorder.stage(name)`` times a block of code;
+* ``recorder.timed(name, func)`` times every call of *func* (one item
+  per call);
+* ``recorder.iterate(name, iterable)`` times each ``next()`` of an
+  iterator and counts the items it yields;
+* ``instrument_adapter(adapter, recorder)`` times every call of the
+  adapter hooks and of its compiled line filters.
+
+For every stage it reports inclusive (``wall`` / ``cpu``) and exclusive
+(``self_wall`` / ``self_cpu``, time not spent in nested stages) seconds,
+the number of calls and items, and, with ``trace_memory=True``, the
+tracemalloc high-water mark reached while the stage was on top of the
+stack.  CPU time is per thread (``time.thread_time``).
+
+``NULL_RECORDER`` has the same interface and does nothing, so callers
+can instrument unconditionally.
+"""
+
+import copy
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Adapter hooks timed by instrument_adapter().  junk_patterns is not one
+# of them: it only runs once per adapter class, to compile the filters.
+ADAPTER_HOOKS = ("is_opening_balance", "parse_date_and_text", "clean_raw_text")
+
+# Per-line checks of the compiled LineFilters, timed in its place
+LINE_FILTER_CHECKS = ("is_junk", "is_footer")
+
+
+class _Stage:
+    __slots__ = ("wall", "cpu", "child_wall", "child_cpu", "calls", "items", "peak_bytes")
+
+    def __init__(self):
+        self.wall = self.cpu = self.child_wall = self.child_cpu = 0.0
+        self.calls = self.items = 0
+        self.peak_bytes = 0
+
+
+class StageRecorder:
+    """Collects stage metrics for one run; see the module docstring."""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracing = False
+
+    # ── Recording ──────────────────────────────────────────────────────
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _get(self, name):
+        stage = self._stages.get(name)
+        if stage is None:
+            with self._lock:
+                stage = self._stages.setdefault(name, _Stage())
+        return stage
+
+    def _mark_memory(self, stack):
+        # Charge the tracemalloc peak since the last boundary to the
+        # stage that was running, then start a new interval.
+        if self.trace_memory and stack:
+            peak = tracemalloc.get_traced_memory()[1]
+            top = self._get(stack[-1])
+            top.peak_bytes = max(top.peak_bytes, peak)
+            tracemalloc.reset_peak()
+
+    def _enter(self, name):
+        stack = self._stack()
+        self._mark_memory(stack)
+        stack.append(name)
+        return time.perf_counter(), time.thread_time()
+
+    def _exit(self, name, started, items=0):
+        wall = time.perf_counter() - started[0]
+        cpu = time.thread_time() - started[1]
+        stack = self._stack()
+        self._mark_memory(stack)
+        stack.pop()
+
+        stage = self._get(name)
+        parent = self._get(stack[-1]) if stack else None
+        with self._lock:
+            stage.wall += wall
+            stage.cpu += cpu
+            stage.calls += 1
+            stage.items += items
+            if parent is not None:
+                parent.child_wall += wall
+                parent.child_cpu += cpu
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one call of stage *name*."""
+        started = self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit(name, started)
+
+    def add_items(self, name, count):
+        """Add *count* processed items to stage *name*."""
+        stage = self._get(name)
+        with self._lock:
+            stage.items += count
+
+    def record(self, name, wall, cpu=0.0, items=0):
+        """Add a call measured elsewhere (e.g. in another process) to stage *name*."""
+        stage = self._get(name)
+        with self._lock:
+            stage.wall += wall
+            stage.cpu += cpu
+            stage.calls += 1
+            stage.items += items
+
+    def iterate(self, name, iterable):
+        """Yield from *iterable*, timing each ``next()`` as stage *name*."""
+        it = iter(iterable)
+        while True:
+            started = self._enter(name)
+            try:
+                item = next(it)
+            except StopIteration:
+                self._exit(name, started)
+                return
+            except BaseException:
+                self._exit(name, started)
+                raise
+            self._exit(name, started, items=1)
+            yield item
+
+    def timed(self, name, func):
+        """Wrap *func* so that every call is recorded as stage *name*."""
+        def wrapper(*args, **kwargs):
+            started = self._enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit(name, started, items=1)
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    # ── Lifecycle / reporting ──────────────────────────────────────────
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def stop(self):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def as_dict(self):
+        """``{stage: {wall, cpu, self_wall, self_cpu, calls, items[, peak_bytes]}}``."""
+        result = {}
+        for name, s in self._stages.items():
+            result[name] = {
+                "wall": s.wall,
+                "cpu": s.cpu,
+                "self_wall": s.wall - s.child_wall,
+                "self_cpu": s.cpu - s.child_cpu,
+                "calls": s.calls,
+                "items": s.items,
+            }
+            if self.trace_memory:
+                result[name]["peak_bytes"] = s.peak_bytes
+        return result
+
+
+class _NullRecorder:
+    """Drop-in StageRecorder that records nothing."""
+
+    trace_memory = False
+
+    @contextmanager
+    def stage(self, name):
+        yield
+
+    def add_items(self, name, count):
+        pass
+
+    def record(self, name, wall, cpu=0.0, items=0):
+        pass
+
+    def iterate(self, name, iterable):
+        return iterable
+
+    def timed(self, name, func):
+        return func
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+    def as_dict(self):
+        return {}
+
+
+NULL_RECORDER = _NullRecorder()
+
+
+def instrument_adapter(adapter, recorder):
+    """
+    Time every call of the adapter hooks (``ADAPTER_HOOKS``) on this
+    *adapter* instance as stages named ``hook:<name>``, and every call of
+    its line filters (``LINE_FILTER_CHECKS``) as ``filter:<name>``.
+    """
+    if recorder is NULL_RECORDER:
+        return adapter
+    for hook in ADAPTER_HOOKS:
+        setattr(adapter, hook, recorder.timed(f"hook:{hook}", getattr(adapter, hook)))
+
+    # The filters are shared by the class: time a copy for this instance
+    filters = copy.copy(adapter.line_filters())
+    for check in LINE_FILTER_CHECKS:
+        setattr(filters, check, recorder.timed(f"filter:{check}", getattr(filters, check)))
+    adapter.line_filters = lambda: filters
+    return adapter
+
+
+def format_stages(stages, limit=None):
+    """Human-readable lines for ``as_dict()`` output, slowest (self time) first."""
+    ranked = sorted(stages.items(), key=lambda item: -item[1]["self_wall"])
+    lines = []
+    for name, s in ranked[:limit]:
+        line = (
+            f"{name:<26} {s['self_wall']:8.3f}s self {s['wall']:8.3f}s total "
+            f"{s['self_cpu']:8.3f}s cpu {s['calls']:>8} calls {s['items']:>8} items"
+        )
+        if "peak_bytes" in s:
+            line += f" {s['peak_bytes'] / 2**20:8.1f} MiB peak"
+        lines.append(line)
+    return lines
+
+
+def max_rss_kb():
+    """Peak resident set size of this process in KiB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:   # Windows
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def append_jsonl(path, record):
+    """Append *record* to the JSON-lines file at *path*."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, default=str) + "\n")
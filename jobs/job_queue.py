@@ -0,0 +1,274 @@
+"""
+job_queue
+~~~~~~~~~
+Persistent job queue backed by a local SQLite file.
+
+A job is one uploaded statement.  Its life cycle is
+
+    queued -> running -> done
+                      -> queued   (failed, attempts left: retried after a delay)
+                      -> failed   (rejected, or out of attempts)
+
+Any number of processes may share the database: each opens its own
+connection, and jobs are claimed inside an IMMEDIATE transaction so two
+workers never pick up the same job.  A running job belongs to the worker
+that claimed it: only that worker may complete or fail it, and it sends
+heartbeats while the job runs.  A job whose heartbeat stops is put back
+in the queue, and a late result from its old worker is then discarded.  Outputs (journal PDF, Tally sheet)
+are stored as BLOBs next to the job, so nothing else touches the disk.
+"""
+
+import sqlite3
+import time
+import uuid
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Jobs still 'running' this long after their last heartbeat are assumed
+# to belong to a dead worker and are put back in the queue.
+DEFAULT_STALE_SECONDS = 15 * 60
+
+# A retried job waits this long before it can be claimed again, doubled
+# for every attempt it has already used.
+DEFAULT_RETRY_DELAY_SECONDS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           TEXT PRIMARY KEY,
+    filename     TEXT NOT NULL,
+    pdf          BLOB NOT NULL,
+    status       TEXT NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    error        TEXT,
+    bank         TEXT,
+    holder       TEXT,
+    worker       TEXT,
+    created_at   REAL NOT NULL,
+    started_at   REAL,
+    finished_at  REAL,
+    heartbeat_at REAL,
+    not_before   REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS outputs (
+    job_id   TEXT NOT NULL REFERENCES jobs (id),
+    name     TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    data     BLOB NOT NULL,
+    PRIMARY KEY (job_id, name)
+);
+"""
+
+# Columns added after the first release: (name, declaration)
+_ADDED_COLUMNS = [
+    ("heartbeat_at", "REAL"),
+    ("not_before", "REAL"),
+]
+
+# Columns returned by status(); the PDF itself is never sent back.
+_STATUS_COLUMNS = [
+    "id", "filename", "status", "attempts", "max_attempts", "error",
+    "bank", "holder", "worker", "created_at", "started_at", "finished_at",
+    "heartbeat_at", "not_before",
+]
+
+
+class JobQueue:
+    """SQLite job queue stored at *db_path* (one instance per process)."""
+
+    def __init__(self, db_path, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 retry_delay_seconds=DEFAULT_RETRY_DELAY_SECONDS):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        # Autocommit mode; transactions are opened explicitly where needed.
+        # check_same_thread=False because the HTTP server handles requests
+        # on several threads; sqlite3 serializes access to the connection.
+        self._conn = sqlite3.connect(
+            db_path, timeout=30, isolation_level=None, check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._add_missing_columns()
+
+    def close(self):
+        self._conn.close()
+
+    def _add_missing_columns(self):
+        """Bring a database created by an older version up to the current schema."""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for name, decl in _ADDED_COLUMNS:
+            if name not in existing:
+                try:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {decl}")
+                except sqlite3.OperationalError:
+                    # Another process added it first
+                    pass
+
+    # --- Producers ---
+
+    def submit(self, pdf_bytes, filename):
+        """Queue a statement and return its job id."""
+        job_id = uuid.uuid4().hex
+        self._conn.execute(
+            "INSERT INTO jobs (id, filename, pdf, status, max_attempts, created_at)"
+            " VALUES (?, ?, ?, 'queued', ?, ?)",
+            (job_id, filename, pdf_bytes, self.max_attempts, time.time()),
+        )
+        return job_id
+
+    def status(self, job_id):
+        """Job row as a dict (plus the names of its outputs), or None."""
+        row = self._conn.execute(
+            f"SELECT {', '.join(_STATUS_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(_STATUS_COLUMNS, row))
+        job["outputs"] = {
+            name: filename
+            for name, filename in self._conn.execute(
+                "SELECT name, filename FROM outputs WHERE job_id = ?", (job_id,)
+            )
+        }
+        return job
+
+    def output(self, job_id, name):
+        """Return ``(filename, bytes)`` for one output of a job, or None."""
+        return self._conn.execute(
+            "SELECT filename, data FROM outputs WHERE job_id = ? AND name = ?",
+            (job_id, name),
+        ).fetchone()
+
+    # --- Workers ---
+
+    def claim(self, worker):
+        """
+        Atomically take the oldest queued job for *worker*, skipping
+        retries whose delay has not passed yet.
+        Returns ``(job_id, filename, pdf_bytes)`` or None if no job is ready.
+        """
+        conn = self._conn
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, filename, pdf FROM jobs WHERE status = 'queued'"
+                " AND (not_before IS NULL OR not_before <= ?)"
+                " ORDER BY created_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, started_at = ?,"
+                    " heartbeat_at = ?, not_before = NULL, attempts = attempts + 1"
+                    " WHERE id = ?",
+                    (worker, now, now, row[0]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def heartbeat(self, job_id, worker):
+        """
+        Tell the queue *worker* is still running *job_id*.  Returns False
+        if the job is no longer that worker's (requeued as stale).
+        """
+        cur = self._conn.execute(
+            "UPDATE jobs SET heartbeat_at = ?"
+            " WHERE id = ? AND status = 'running' AND worker = ?",
+            (time.time(), job_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, job_id, worker, data, outputs):
+        """
+        Mark a job done and store its outputs.
+        *data* is the pipeline result; *outputs* maps name -> (filename, bytes).
+        Returns False (and stores nothing) if *worker* no longer owns the job.
+        """
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'done', error = NULL, bank = ?, holder = ?,"
+                " finished_at = ? WHERE id = ? AND status = 'running' AND worker = ?",
+                (data.get("bank"), data.get("holder"), time.time(), job_id, worker),
+            )
+            if cur.rowcount != 1:
+                conn.execute("ROLLBACK")
+                return False
+            conn.executemany(
+                "INSERT OR REPLACE INTO outputs (job_id, name, filename, data) VALUES (?, ?, ?, ?)",
+                [(job_id, name, fn, blob) for name, (fn, blob) in outputs.items()],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def fail(self, job_id, worker, error, retry=True):
+        """
+        Record a failed attempt.  The job goes back to the queue while it
+        has attempts left (and *retry* is true), not to be claimed again
+        before ``retry_delay_seconds * 2 ** (attempts - 1)`` have passed;
+        otherwise it is 'failed'.  Returns False if *worker* no longer
+        owns the job.
+        """
+        now = time.time()
+        cur = self._conn.execute(
+            "UPDATE jobs SET error = ?, finished_at = ?,"
+            " not_before = ? + ? * (1 << (attempts - 1)), status ="
+            " CASE WHEN ? AND attempts < max_attempts THEN 'queued' ELSE 'failed' END"
+            " WHERE id = ? AND status = 'running' AND worker = ?",
+            (error, now, now, self.retry_delay_seconds, bool(retry), job_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def requeue_stale(self, stale_seconds=DEFAULT_STALE_SECONDS):
+        """Put jobs orphaned by a crashed worker back in the queue; returns the count."""
+        now = time.time()
+        cur = self._conn.execute(
+            "UPDATE jobs SET status ="
+            " CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,"
+            " error = 'worker stopped responding',"
+            " not_before = ? + ? * (1 << (attempts - 1))"
+            " WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < ?",
+            (now, self.retry_delay_seconds, now - stale_seconds),
+        )
+        return cur.rowcount
+
+    # --- Reporting ---
+
+    def metrics(self, window_seconds=300):
+        """
+        Queue depth per status plus throughput over the last
+        *window_seconds*: jobs finished, jobs per minute, and the average
+        wait (created -> started) and run time (started -> finished).
+        """
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        counts.update(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+
+        since = time.time() - window_seconds
+        finished, avg_wait, avg_run = self._conn.execute(
+            "SELECT COUNT(*), AVG(started_at - created_at), AVG(finished_at - started_at)"
+            " FROM jobs WHERE status = 'done' AND finished_at >= ?",
+            (since,),
+        ).fetchone()
+        retries = self._conn.execute(
+            "SELECT COALESCE(SUM(attempts - 1), 0) FROM jobs WHERE attempts > 1"
+        ).fetchone()[0]
+
+        return {
+            "jobs": counts,
+            "retries": retries,
+            "window_seconds": window_seconds,
+            "finished_in_window": finished,
+            "jobs_per_minute": finished * 60.0 / window_seconds,
+            "avg_wait_seconds": avg_wait,
+            "avg_run_seconds": avg_run,
+        }
@@ -0,0 +1,151 @@
+"""
+server
+~~~~~~
+REST-style HTTP front end for the job queue (stdlib only).
+
+    POST /jobs?filename=sbi.pdf      body: the PDF bytes
+         -> 202 {"id": "...", "status": "queued"}
+    GET  /jobs/<id>                  -> job status, error and output names
+    GET  /jobs/<id>/outputs/<name>   -> the output file ("journal" or "tally")
+    GET  /metrics                    -> queue depth and throughput
+
+Run it together with its workers:
+
+    python -m jobs.server --port 8502 --workers 4
+"""
+
+import argparse
+import json
+import os
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from jobs.job_queue import JobQueue
+from jobs.worker import start_workers
+
+DEFAULT_DB = "jobs.sqlite3"
+CACHE_DIR = ".cache/results"
+
+# Uploads larger than this are refused before being read.
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+# Characters kept in an uploaded file name; anything else (CR/LF, quotes,
+# path separators) would end up in the Content-Disposition header of
+# the outputs, so it is replaced.
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9 ._()-]")
+
+_MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def safe_filename(name, default="statement.pdf"):
+    """*name* reduced to a plain file name that is safe to echo in a header."""
+    name = _UNSAFE_FILENAME_RE.sub("_", os.path.basename(name)).strip(" .")
+    return name or default
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """Routes the endpoints above to ``self.server.queue``."""
+
+    def _send_json(self, code, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _path_parts(self):
+        url = urlparse(self.path)
+        return [unquote(p) for p in url.path.split("/") if p], parse_qs(url.query)
+
+    def do_POST(self):
+        parts, query = self._path_parts()
+        if parts != ["jobs"]:
+            return self._send_json(404, {"error": "not found"})
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return self._send_json(400, {"error": "request body must be the PDF bytes"})
+        if length > MAX_UPLOAD_BYTES:
+            return self._send_json(413, {"error": "upload too large"})
+
+        pdf_bytes = self.rfile.read(length)
+        filename = safe_filename(query.get("filename", [""])[0])
+        job_id = self.server.queue.submit(pdf_bytes, filename)
+        self._send_json(202, {"id": job_id, "status": "queued"})
+
+    def do_GET(self):
+        parts, _ = self._path_parts()
+
+        if parts == ["metrics"]:
+            return self._send_json(200, self.server.queue.metrics())
+
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = self.server.queue.status(parts[1])
+            if job is None:
+                return self._send_json(404, {"error": "unknown job"})
+            return self._send_json(200, job)
+
+        if len(parts) == 4 and parts[0] == "jobs" and parts[2] == "outputs":
+            found = self.server.queue.output(parts[1], parts[3])
+            if found is None:
+                return self._send_json(404, {"error": "output not available"})
+            filename, data = found
+            self.send_response(200)
+            self.send_header(
+                "Content-Type",
+                _MIME_TYPES.get(os.path.splitext(filename)[1], "application/octet-stream"),
+            )
+            # Re-checked here for jobs submitted before names were cleaned
+            self.send_header(
+                "Content-Disposition", f'attachment; filename="{safe_filename(filename)}"',
+            )
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        self._send_json(404, {"error": "not found"})
+
+
+def make_server(db_path=DEFAULT_DB, host="127.0.0.1", port=8502):
+    """Build (but do not start) the HTTP server for the queue at *db_path*."""
+    server = ThreadingHTTPServer((host, port), JobRequestHandler)
+    server.queue = JobQueue(db_path)
+    return server
+
+
+def _parse_args():
+    ap = argparse.ArgumentParser(description="Statement job queue: HTTP API plus local workers.")
+    ap.add_argument("--db", default=DEFAULT_DB, help=f"SQLite queue file (default: {DEFAULT_DB})")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8502)
+    ap.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="worker processes draining the queue (default: CPU count; 0 = API only)",
+    )
+    ap.add_argument(
+        "--cache-dir", default=CACHE_DIR,
+        help="parsed-statement cache shared with the web app ('' to disable)",
+    )
+    return ap.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    server = make_server(args.db, args.host, args.port)
+    processes, stop = start_workers(args.db, args.workers, args.cache_dir or None)
+    print(f"Serving jobs on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stop.set()
+        for p in processes:
+            p.join()
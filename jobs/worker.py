@@ -0,0 +1,134 @@
+"""
+worker
+~~~~~~
+Worker processes that drain the job queue through ``pipeline.run_pipeline``.
+
+Each worker claims one job at a time.  Statements the pipeline rejects
+(unsupported bank, no transactions) fail at once; any other exception
+is retried until the job runs out of attempts.  While a job runs, a
+thread sends heartbeats so the queue does not requeue it as stale; an
+error while recording the result is logged and the worker moves on.
+"""
+
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+
+from jobs.job_queue import DEFAULT_STALE_SECONDS, JobQueue
+from pipeline import StatementRejected, run_pipeline
+
+DEFAULT_POLL_SECONDS = 1.0
+
+# Well inside the stale window, so a few missed beats do not requeue a job
+DEFAULT_HEARTBEAT_SECONDS = DEFAULT_STALE_SECONDS / 10
+
+# How often each worker looks for jobs left by dead workers, busy or not
+DEFAULT_REQUEUE_SECONDS = 60.0
+
+
+def _heartbeat(queue, job_id, worker, interval, done):
+    """Beat every *interval* seconds until *done* is set or the job is lost."""
+    while not done.wait(interval):
+        try:
+            if not queue.heartbeat(job_id, worker):
+                return
+        except Exception:
+            # Database busy; try again on the next beat
+            traceback.print_exc(file=sys.stderr)
+
+
+def run_one(queue, worker, cache_dir=None, heartbeat_seconds=DEFAULT_HEARTBEAT_SECONDS):
+    """Process the next queued job.  Returns False if no job was ready."""
+    job = queue.claim(worker)
+    if job is None:
+        return False
+
+    job_id, filename, pdf_bytes = job
+
+    # 1. Run the pipeline with heartbeats going
+    done = threading.Event()
+    beat = threading.Thread(
+        target=_heartbeat, args=(queue, job_id, worker, heartbeat_seconds, done),
+        name=f"heartbeat-{job_id}", daemon=True,
+    )
+    beat.start()
+    try:
+        data = run_pipeline(pdf_bytes, filename, cache_dir)
+        error = None
+    except StatementRejected as e:
+        data, error, retry = None, str(e), False
+    except Exception as e:
+        data, error, retry = None, f"{type(e).__name__}: {e}", True
+    finally:
+        done.set()
+        beat.join()
+
+    # 2. Record the result; a failure here must not stop the worker
+    try:
+        if error is not None:
+            queue.fail(job_id, worker, error, retry=retry)
+        elif not queue.complete(job_id, worker, data, {
+            "journal": (data["journal_name"], data["journal_data"]),
+            "tally": (data["tally_name"], data["tally_data"]),
+        }):
+            print(f"job {job_id}: requeued while running, result discarded", file=sys.stderr)
+    except Exception as e:
+        traceback.print_exc(file=sys.stderr)
+        try:
+            queue.fail(job_id, worker, f"could not store result: {type(e).__name__}: {e}")
+        except Exception:
+            # Left 'running'; requeue_stale picks it up once heartbeats stop
+            traceback.print_exc(file=sys.stderr)
+    return True
+
+
+def worker_loop(db_path, cache_dir=None, poll_seconds=DEFAULT_POLL_SECONDS, stop=None,
+                requeue_seconds=DEFAULT_REQUEUE_SECONDS):
+    """
+    Run jobs until *stop* (a ``multiprocessing.Event``) is set, sleeping
+    *poll_seconds* whenever the queue is empty.  Every *requeue_seconds*,
+    between jobs, stale jobs of dead workers are put back in the queue.
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    queue = JobQueue(db_path)
+    next_requeue = 0.0
+    try:
+        while stop is None or not stop.is_set():
+            try:
+                # On a timer, so a busy queue does not starve orphaned jobs
+                if time.monotonic() >= next_requeue:
+                    queue.requeue_stale()
+                    next_requeue = time.monotonic() + requeue_seconds
+                if run_one(queue, worker, cache_dir):
+                    continue
+            except Exception:
+                # e.g. the database is locked for longer than the timeout
+                traceback.print_exc(file=sys.stderr)
+            time.sleep(poll_seconds)
+    finally:
+        queue.close()
+
+
+def start_workers(db_path, count, cache_dir=None, poll_seconds=DEFAULT_POLL_SECONDS):
+    """
+    Start *count* worker processes.  Returns ``(processes, stop_event)``;
+    set the event and join the processes to shut them down.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    processes = [
+        ctx.Process(
+            target=worker_loop,
+            args=(db_path, cache_dir, poll_seconds, stop),
+            name=f"job-worker-{i}",
+            daemon=True,
+        )
+        for i in range(count)
+    ]
+    for p in processes:
+        p.start()
+    return processes, stop
@@ -1,75 +1,369 @@
+import argparse
+import cProfile
+import itertools
 import os
-from accounting.classifier import classify_transaction
-from accounting.journal_builder import build_journal_entry
-from writers.journal_pdf import generate_journal_pdf
-from writers.tally_excel import generate_tally_excel
-from parser.account_holder import extract_account_holder_name
-from parser.bank_detector import detect_bank
+import time
+import uuid
+from concurrent.futures import as_completed
+
+from accounting.journal_builder import iter_journal_entries
+from writers.output_stage import (
+    DEFAULT_OUTPUTS,
+    OUTPUT_WRITERS,
+    check_outputs,
+    output_targets,
+    run_output_stage,
+)
+from parser.account_holder import extract_account_holder_name, extract_account_number
+from parser.account_state import AccountStateStore, IncrementalFilter, first_unseen_page
+from parser.bank_detector import detect_bank_with_method
+from parser.statement_document import StatementDocument
+from parser.ocr_parser import ocr_available
+from parser.result_cache import ResultCache
 from adapters import get_adapter
+from instrumentation import (
+    NULL_RECORDER,
+    StageRecorder,
+    append_jsonl,
+    format_stages,
+    instrument_adapter,
+    max_rss_kb,
+)
 
 INPUT_DIR = "input"
 OUTPUT_DIR = "output"
+OCR_CACHE_DIR = ".cache/ocr"  # OCR text of scanned pages, by page hash
+
+def process_file(filename, page_workers=1, outputs=DEFAULT_OUTPUTS, output_executor="stream",
+                 ocr_workers=1, metrics=False, trace_memory=False, profile_dir=None,
+                 state_dir=None):
+    """
+    Run the full pipeline for one statement in INPUT_DIR.
+    ``page_workers > 1`` extracts the statement's pages in parallel;
+    *outputs* and *output_executor* configure the output stage (see
+    ``writers.output_stage``).  Pages without a text layer are OCR'd in
+    *ocr_workers* processes (0 disables OCR).
+
+    With *metrics* (or *trace_memory*), every stage and adapter hook is
+    timed (see ``instrumentation``) and the numbers are returned in
+    ``result["metrics"]``.  With *profile_dir*, the run is profiled with
+    cProfile and the stats are dumped to ``<profile_dir>/<stem>.prof``
+    (main thread only: use ``output_executor="thread"`` and the writers
+    still show up in the stage metrics).
+
+    With *state_dir*, the run is incremental (see ``parser.account_state``):
+    only transactions after the account's stored checkpoint are written,
+    and the checkpoint moves forward once the outputs are written.
+
+    Never raises: errors are captured in the returned result dict so a
+    single bad PDF cannot take down a batch (or a pool worker).  Progress
+    lines are collected in ``result["log"]`` instead of printed, so output
+    from parallel workers does not interleave.
+
+    The statement is streamed: pages yield raw transactions, which are
+    normalized, classified and journaled lazily and fed to both writers
+    in one pass (with the default "stream" output executor), so no stage
+    holds the full transaction list.
+    """
+    pdf_path = os.path.join(INPUT_DIR, filename)
+    result = {
+        "filename": filename,
+        "status": "error",
+        "error": None,
+        "journal_path": None,
+        "tally_path": None,
+        "outputs": {},
+        "output_timings": {},
+        "log": [],
+    }
+    log = result["log"]
+    start = time.perf_counter()
+
+    recorder = StageRecorder(trace_memory) if metrics or trace_memory else NULL_RECORDER
+    profiler = cProfile.Profile() if profile_dir else None
+
+    try:
+        recorder.start()
+        if profiler:
+            profiler.enable()
+
+        # Open once; only the header pages used by detection and the
+        # holder lookup are kept in the page cache.
+        with recorder.stage("open"):
+            doc = StatementDocument(pdf_path, cache_limit=2)
+
+        with doc:
+            # pdfplumber's page extraction, whichever stage triggers it
+            doc.page_text = recorder.timed("pdf_text", doc.page_text)
+            doc.prefetch_pages = recorder.timed("prefetch", doc.prefetch_pages)
+
+            # 0. OCR scanned pages (a no-op for text PDFs)
+            if ocr_workers and ocr_available():
+                with recorder.stage("ocr"):
+                    scanned = doc.enable_ocr(workers=ocr_workers, cache=ResultCache(OCR_CACHE_DIR))
+                if scanned:
+                    log.append(f"  OCR: {scanned} page(s) without a text layer")
+
+            # 1. Detect Bank
+            with recorder.stage("detect"):
+                bank, method = detect_bank_with_method(doc)
+            log.append(f"  Detected Bank: {bank} (via {method})")
+            result["bank"] = bank
+
+            adapter = instrument_adapter(get_adapter(bank, page_workers=page_workers), recorder)
+
+            # 2. Get Account Holder
+            with recorder.stage("holder"):
+                account_holder = extract_account_holder_name(doc)
+            log.append(f"  Account Holder: {account_holder}")
+
+            # 2b. Incremental runs resume after the account's checkpoint
+            start_page = 0
+            delta = None
+            if state_dir:
+                with recorder.stage("checkpoint"):
+                    store = AccountStateStore(state_dir)
+                    account_key = store.key_for(account_holder, bank, extract_account_number(doc))
+                    state = store.get(account_key) if account_key else None
+                    if state:
+                        start_page = first_unseen_page(doc, state["last_date"])
+                if account_key is None:
+                    log.append(
+                        "  WARNING: account number or holder not found; "
+                        "processing the whole statement without a checkpoint"
+                    )
+                else:
+                    delta = IncrementalFilter(state, pages_skipped=start_page)
+                if state:
+                    log.append(
+                        f"  Resuming after {state['last_date']} "
+                        f"(skipping {start_page} of {doc.page_count} pages)"
+                    )
+
+            # 3. Process Transactions (lazily; the 'OPENING' row is only
+            # used internally to calculate the first balance and is skipped)
+            transactions = adapter.iter_transactions(doc, recorder, start_page)
+            if delta:
+                transactions = delta.filter(transactions)
+            entries = iter_journal_entries(transactions, recorder)
+
+            first = next(entries, None)
+            if first is None:
+                if delta and delta.state:
+                    log.append(f"  No transactions after {delta.state['last_date']}. Nothing to write.")
+                else:
+                    log.append("  WARNING: No transactions found. Skipping output generation.")
+                result["status"] = "skipped"
+                return result
+            entries = itertools.chain([first], entries)
+
+            # 4. Generate Outputs with Dynamic Names
+            # Example: "sbi.pdf" -> "sbi Journal.pdf"
+            stem = os.path.splitext(filename)[0]
+            targets = output_targets(stem, OUTPUT_DIR, outputs)
+
+            stage = run_output_stage(
+                entries, targets, account_holder, executor=output_executor, recorder=recorder,
+            )
+
+        if delta:
+            store.put(account_key, dict(
+                delta.checkpoint(), holder=account_holder, bank=bank, source=filename,
+            ))
+            log.append(f"  Incremental: {delta.new_rows} new, {delta.skipped_rows} already processed")
+
+        for name in targets:
+            log.append(f"  {name}: {targets[name]} ({stage['timings'][name]:.2f}s)")
+        log.append("  Success!")
+        result.update(
+            status="ok",
+            journal_path=targets.get("journal"),
+            tally_path=targets.get("tally"),
+            outputs=stage["outputs"],
+            output_timings=stage["timings"],
+        )
+
+    except Exception as e:
+        log.append(f"  ERROR processing {filename}: {e}")
+        result["error"] = str(e)
+
+    finally:
+        result["seconds"] = time.perf_counter() - start
+
+        if profiler:
+            profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            result["profile_path"] = os.path.join(profile_dir, f"{os.path.splitext(filename)[0]}.prof")
+            profiler.dump_stats(result["profile_path"])
+
+        recorder.stop()
+        if recorder is not NULL_RECORDER:
+            stages = recorder.as_dict()
+            result["metrics"] = {"stages": stages, "max_rss_kb": max_rss_kb()}
+            log.append("  Stages (by self time):")
+            log.extend(f"    {line}" for line in format_stages(stages))
+
+    return result
 
-def process_all_files():
+def _print_result(result):
+    print(f"--- Processing: {result['filename']} ---")
+    for line in result["log"]:
+        print(line)
+    print("\n")
+
+def _print_summary(results, wall_seconds):
+    print("=== Summary ===")
+    for r in sorted(results, key=lambda r: r["filename"]):
+        print(f"  {r['status']:<8} {r['seconds']:8.2f}s  {r['filename']}")
+
+    failures = [r for r in results if r["status"] == "error"]
+    ok = sum(1 for r in results if r["status"] == "ok")
+    print(f"\n  {ok}/{len(results)} succeeded in {wall_seconds:.2f}s wall time")
+    if failures:
+        print(f"  {len(failures)} failed:")
+        for r in failures:
+            print(f"    {r['filename']}: {r['error']}")
+
+def _metrics_record(run_id, result, settings):
+    """One JSON-lines record per statement, for aggregating across runs."""
+    metrics = result.get("metrics", {})
+    return {
+        "run_id": run_id,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "filename": result["filename"],
+        "status": result["status"],
+        "error": result["error"],
+        "bank": result.get("bank"),
+        "seconds": result["seconds"],
+        "max_rss_kb": metrics.get("max_rss_kb"),
+        "profile_path": result.get("profile_path"),
+        "settings": settings,
+        "stages": metrics.get("stages", {}),
+    }
+
+def process_all_files(workers=1, page_workers=1, outputs=DEFAULT_OUTPUTS, output_executor="stream",
+                      ocr_workers=1, metrics_log=None, trace_memory=False, profile_dir=None,
+                      state_dir=None):
+    """
+    Process every PDF in INPUT_DIR.  With *metrics_log*, per-stage
+    metrics for each statement are appended to that JSON-lines file;
+    *trace_memory*, *profile_dir* and *state_dir* are passed on to
+    ``process_file``.
+    """
     # Ensure output directory exists
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     # Get all PDF files
     files = [f for f in os.listdir(INPUT_DIR) if f.lower().endswith(".pdf")]
-    
+
     if not files:
         print(f"No PDF files found in '{INPUT_DIR}/'")
         return
 
     print(f"Found {len(files)} statements to process.\n")
 
-    for filename in files:
-        print(f"--- Processing: {filename} ---")
-        pdf_path = os.path.join(INPUT_DIR, filename)
-
-        try:
-            # 1. Detect Bank & Build Context
-            bank = detect_bank(pdf_path)
-            print(f"  Detected Bank: {bank}")
-            
-            adapter = get_adapter(bank)
-            context = adapter.build_context(pdf_path)
-            
-            # 2. Get Account Holder
-            account_holder = extract_account_holder_name(pdf_path)
-            print(f"  Account Holder: {account_holder}")
+    results = []
+    start = time.perf_counter()
 
-            # 3. Process Transactions
-            entries = []
-            for txn in context["transactions"]:
-                # SKIP the special 'OPENING' row for Journal/Tally
-                # (It was only used internally to calculate the first balance)
-                if txn["date"] == "OPENING":
-                    continue
+    run_id = uuid.uuid4().hex[:12]
+    settings = {
+        "workers": workers, "page_workers": page_workers, "outputs": list(outputs),
+        "output_executor": output_executor, "ocr_workers": ocr_workers,
+        "trace_memory": trace_memory, "incremental": state_dir is not None,
+    }
+    options = {
+        "metrics": metrics_log is not None,
+        "trace_memory": trace_memory,
+        "profile_dir": profile_dir,
+        "state_dir": state_dir,
+    }
 
-                ttype = classify_transaction(txn)
-                entries.append(build_journal_entry(txn, ttype))
+    def report(result):
+        _print_result(result)
+        results.append(result)
+        if metrics_log:
+            append_jsonl(metrics_log, _metrics_record(run_id, result, settings))
 
-            if not entries:
-                print("  WARNING: No transactions found. Skipping output generation.")
-                continue
+    if workers <= 1:
+        for filename in files:
+            report(process_file(filename, page_workers, outputs, output_executor, ocr_workers, **options))
+    else:
+        # pdfplumber is CPU-bound pure Python, so fan files out to
+        # processes rather than threads.  Each worker writes its own
+        # outputs; results are reported in completion order.
+        # (Imported here: single-process runs skip its startup cost.)
+        from concurrent.futures import ProcessPoolExecutor
 
-            # 4. Generate Outputs with Dynamic Names
-            # Example: "sbi.pdf" -> "sbi Journal.pdf"
-            stem = os.path.splitext(filename)[0]
-            
-            journal_path = os.path.join(OUTPUT_DIR, f"{stem} Journal.pdf")
-            tally_path = os.path.join(OUTPUT_DIR, f"{stem} Tally.xlsx")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    process_file, f, page_workers, outputs, output_executor, ocr_workers, **options
+                )
+                for f in files
+            ]
+            for future in as_completed(futures):
+                report(future.result())
+
+    _print_summary(results, time.perf_counter() - start)
 
-            generate_journal_pdf(entries, journal_path, account_holder)
-            generate_tally_excel(entries, tally_path)
-            
-            print(f"  Success! Output saved to: {journal_path}")
+def _parse_args():
+    ap = argparse.ArgumentParser(description="Build journals and Tally sheets for every PDF in input/.")
+    ap.add_argument(
+        "--workers", type=int, default=1,
+        help="number of statements to process in parallel (default: 1)",
+    )
+    ap.add_argument(
+        "--page-workers", type=int, default=1,
+        help="processes used to extract the pages of each statement (default: 1)",
+    )
+    ap.add_argument(
+        "--outputs", default=",".join(DEFAULT_OUTPUTS),
+        help=f"comma-separated outputs to write (available: {', '.join(OUTPUT_WRITERS)})",
+    )
+    ap.add_argument(
+        "--output-executor", choices=["stream", "thread", "process"], default="stream",
+        help="how the output writers run concurrently (default: stream)",
+    )
+    ap.add_argument(
+        "--ocr-workers", type=int, default=1,
+        help="processes used to OCR scanned pages, if Tesseract is installed (0 = no OCR; default: 1)",
+    )
+    ap.add_argument(
+        "--metrics-log", metavar="FILE",
+        help="time every stage and adapter hook; append one JSON line per statement to FILE",
+    )
+    ap.add_argument(
+        "--trace-memory", action="store_true",
+        help="also record each stage's tracemalloc high-water mark (slower)",
+    )
+    ap.add_argument(
+        "--profile-dir", metavar="DIR",
+        help="write a cProfile dump per statement to DIR/<name>.prof",
+    )
+    ap.add_argument(
+        "--incremental", metavar="STATE_DIR",
+        help="only write transactions newer than each account's last run; checkpoints are kept in STATE_DIR",
+    )
+    args = ap.parse_args()
 
-        except Exception as e:
-            print(f"  ERROR processing {filename}: {e}")
-        
-        print("\n")
+    # Fail before any statement is parsed, not when the first one is written
+    args.outputs = tuple(o.strip() for o in args.outputs.split(",") if o.strip())
+    try:
+        check_outputs(args.outputs)
+    except ValueError as e:
+        ap.error(f"--outputs: {e}")
+    return args
 
 if __name__ == "__main__":
-    process_all_files()
\ No newline at end of file
+    args = _parse_args()
+    process_all_files(
+        workers=args.workers,
+        page_workers=args.page_workers,
+        outputs=args.outputs,
+        output_executor=args.output_executor,
+        ocr_workers=args.ocr_workers,
+        metrics_log=args.metrics_log,
+        trace_memory=args.trace_memory,
+        profile_dir=args.profile_dir,
+        state_dir=args.incremental,
+    )
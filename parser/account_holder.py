@@ -1,12 +1,22 @@
-import pdfplumber
 import re
 
-def extract_account_holder_name(pdf_path):
+from parser.statement_document import open_statement
+
+# "Account Number : 0000 1234 5678", "A/C NO: 0123-456789", "Account No. 123456"
+_ACCOUNT_NO_RE = re.compile(
+    r"\b(?:ACCOUNT|A/C)\s*(?:NUMBER|NO\b\.?)\s*[:.]?\s*(\d[\d -]{4,}\d)",
+    re.IGNORECASE,
+)
+
+# Returned when no header pattern matches
+UNKNOWN_HOLDER = "Unknown Account Holder"
+
+def extract_account_holder_name(source):
     text = ""
-    with pdfplumber.open(pdf_path) as pdf:
+    with open_statement(source) as doc:
         # Scan first 2 pages for the header info
-        for i in range(min(2, len(pdf.pages))):
-            text += "\n" + (pdf.pages[i].extract_text() or "")
+        for page_text in doc.page_texts(0, 2):
+            text += "\n" + page_text
 
     lines = [l.strip() for l in text.splitlines() if l.strip()]
 
@@ -34,4 +44,16 @@ def extract_account_holder_name(pdf_path):
                 clean_name = re.sub(r"^(MS\.\.|M/S\.?|MR\.|MRS\.)\s*", "", name_line, flags=re.IGNORECASE)
                 return clean_name.strip()
 
-    return "Unknown Account Holder"
\ No newline at end of file
+    return UNKNOWN_HOLDER
+
+def extract_account_number(source):
+    """
+    Return the account number printed in the statement header (digits
+    only), or None if the first two pages do not show one.
+    """
+    with open_statement(source) as doc:
+        for page_text in doc.page_texts(0, 2):
+            m = _ACCOUNT_NO_RE.search(page_text)
+            if m:
+                return re.sub(r"\D", "", m.group(1))
+    return None
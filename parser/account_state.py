@@ -0,0 +1,231 @@
+"""
+account_state
+~~~~~~~~~~~~~
+Per-account checkpoints for incremental processing.
+
+Clients re-upload a running year-to-date statement every week, so most
+of each upload has been journaled before.  For every account (holder +
+bank + account number) the store remembers where the last run stopped:
+
+    {"last_date": "14/06/2024", "rows_on_last_date": 3, "closing_balance": 1234.5, ...}
+
+i.e. the date of the last processed transaction, how many transactions
+on that date had been processed, and the balance after the last one.
+On the next upload:
+
+1. ``first_unseen_page`` skips leading pages whose transaction dates are
+   all before ``last_date``, judged from the cheap content-stream
+   strings, so those pages are never extracted with pdfplumber;
+2. ``IncrementalFilter`` drops the rows up to and including the
+   checkpoint row, and checks that the statement still agrees with the
+   stored balance there (or, for a statement starting after the
+   checkpoint, that its first row carries on from it);
+3. only the rows after the checkpoint reach the journal and the
+   writers, and the caller saves ``checkpoint()`` once they succeed.
+
+Anything that does not line up raises ``StatementContinuityError``
+rather than silently skipping or duplicating transactions.
+A statement that does not show its account number (or its holder) has
+no key and is always processed whole: keyed on holder and bank alone,
+two accounts would share one checkpoint.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+
+from parser.account_holder import UNKNOWN_HOLDER
+
+# DD/MM/YYYY, DD-MM-YYYY, DD/MM/YY (the formats the adapters accept)
+_DATE_RE = re.compile(r"^(\d{2})[-/](\d{2})[-/](\d{4}|\d{2})\b")
+
+# Balances are rounded to paise; float noise stays well below this
+_BALANCE_TOLERANCE = 0.01
+
+
+class StatementContinuityError(ValueError):
+    """The statement does not continue from the stored account checkpoint."""
+
+
+def date_key(date):
+    """``(year, month, day)`` for a statement date string, or None."""
+    m = _DATE_RE.match(date.strip())
+    if not m:
+        return None
+    day, month, year = m.groups()
+    if len(year) == 2:
+        year = "20" + year
+    return int(year), int(month), int(day)
+
+
+def _balance_matches(a, b):
+    return abs(a - b) <= _BALANCE_TOLERANCE
+
+
+class AccountStateStore:
+    """
+    One JSON file per account in *state_dir*.  Writes are atomic, so
+    parallel workers may share the folder (two uploads of the *same*
+    account in one batch are still processed independently).
+    """
+
+    def __init__(self, state_dir):
+        self.state_dir = state_dir
+        os.makedirs(state_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(holder, bank, account_number):
+        """
+        Stable key for an account, or None when the statement does not
+        identify one: without the account number (or with an unknown
+        holder) different accounts would share a checkpoint, and one
+        account's rows would be dropped as the other's.
+        """
+        if not account_number or not holder or holder == UNKNOWN_HOLDER:
+            return None
+        identity = [" ".join(holder.upper().split()), bank, account_number]
+        return hashlib.sha256(json.dumps(identity).encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, key):
+        return os.path.join(self.state_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the stored checkpoint for *key*, or None."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, state):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(state, updated_at=time.strftime("%Y-%m-%dT%H:%M:%S")), f, indent=1)
+        os.replace(tmp_path, path)
+
+
+def first_unseen_page(doc, last_date):
+    """
+    Index of the first page that may hold transactions on or after
+    *last_date*.  Leading pages are skipped only while every string on
+    them that starts with a date (the transaction rows) is older; a page
+    with no readable dates (scanned, or custom-encoded fonts) stops the
+    scan.
+    """
+    last = date_key(last_date)
+    if last is None:
+        return 0
+
+    for i in range(doc.page_count):
+        try:
+            strings = doc.page_raw_strings(i)
+        except Exception:
+            return i
+        dates = [date_key(s) for s in strings if _DATE_RE.match(s.strip())]
+        dates = [d for d in dates if d is not None]
+        if not dates or max(dates) >= last:
+            return i
+    return doc.page_count
+
+
+class IncrementalFilter:
+    """
+    Passes on only the normalized transactions after the checkpoint
+    *state* (everything when *state* is None).  *pages_skipped* is what
+    ``first_unseen_page`` returned, so rows on those pages count as seen.
+
+    After the output is written, ``checkpoint()`` is the state to save.
+    """
+
+    def __init__(self, state, pages_skipped=0):
+        self.state = state
+        self.pages_skipped = pages_skipped
+        self.skipped_rows = 0
+        self.new_rows = 0
+
+        # Last row seen, for the next checkpoint
+        self._date = None
+        self._date_key = None
+        self._rows_on_date = 0
+        self._balance = None
+
+    def filter(self, transactions):
+        """Yield the rows of *transactions* not yet processed."""
+        state = self.state
+        caught_up = state is None
+        if not caught_up:
+            last = date_key(state["last_date"])
+            rows_on_last = state["rows_on_last_date"]
+            closing = state["closing_balance"]
+            seen_older = self.pages_skipped > 0
+            seen_on_last = 0
+
+        for txn in transactions:
+            key = date_key(txn["date"])
+
+            # 1. Track the last row (and how many share its date)
+            if key is not None and key == self._date_key:
+                self._rows_on_date += 1
+            else:
+                self._date, self._date_key, self._rows_on_date = txn["date"], key, 1
+            self._balance = txn["balance"]
+
+            if not caught_up:
+                if key is None:
+                    raise StatementContinuityError(f"unreadable transaction date {txn['date']!r}")
+
+                # 2. Already processed: older rows, and the checkpoint
+                #    date's rows up to the stored count
+                if key < last:
+                    seen_older = True
+                    self.skipped_rows += 1
+                    continue
+                if key == last and seen_on_last < rows_on_last:
+                    seen_on_last += 1
+                    self.skipped_rows += 1
+                    if seen_on_last == rows_on_last:
+                        if not _balance_matches(txn["balance"], closing):
+                            raise StatementContinuityError(
+                                f"balance after the last processed transaction ({state['last_date']}) "
+                                f"is {txn['balance']:.2f} in this statement, expected {closing:.2f}"
+                            )
+                        caught_up = True
+                    continue
+
+                # 3. A newer row before the checkpoint was found: the
+                #    statement skips or rewrote processed transactions
+                if seen_older or seen_on_last:
+                    raise StatementContinuityError(
+                        f"last processed transaction ({state['last_date']}, "
+                        f"row {rows_on_last} of that date) is not in this statement"
+                    )
+
+                # 4. The statement starts after the checkpoint; its first
+                #    row must carry on from the stored closing balance
+                amount = txn["amount"]
+                openings = {
+                    "credit": [txn["balance"] - amount],
+                    "debit": [txn["balance"] + amount],
+                }.get(txn["direction"], [txn["balance"] - amount, txn["balance"] + amount])
+                if not any(_balance_matches(o, closing) for o in openings):
+                    raise StatementContinuityError(
+                        f"statement does not continue from the stored closing balance "
+                        f"{closing:.2f} ({state['last_date']})"
+                    )
+                caught_up = True
+
+            self.new_rows += 1
+            yield txn
+
+    def checkpoint(self):
+        """The state after this run, or None if there was nothing new."""
+        if not self.new_rows:
+            return None
+        return {
+            "last_date": self._date,
+            "rows_on_last_date": self._rows_on_date,
+            "closing_balance": self._balance,
+        }
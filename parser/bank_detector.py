@@ -1,23 +1,78 @@
-import pdfplumber
 from config import BANK_FINGERPRINTS
+from parser.statement_document import open_statement
 
+# Metadata fields worth checking for a bank name
+_METADATA_KEYS = ("Title", "Author", "Subject", "Creator", "Producer", "Keywords")
 
-def detect_bank(pdf_path):
-    import pdfplumber
-    from config import BANK_FINGERPRINTS
 
-    text = ""
-    with pdfplumber.open(pdf_path) as pdf:
-        for i in range(min(2, len(pdf.pages))):
-            page_text = pdf.pages[i].extract_text() or ""
-            text += "\n" + page_text.upper()
+# Multi-word fingerprints only.  A bare "SBI" also matches IFSC codes
+# ("SBIN0001234") and other banks' text, so the fast path must not
+# decide on it; the layout path still uses every fingerprint.
+_FAST_FINGERPRINTS = {
+    bank: [kw for kw in keywords if " " in kw]
+    for bank, keywords in BANK_FINGERPRINTS.items()
+}
 
-    text = " ".join(text.split())  # normalize whitespace
 
-    for bank, keywords in BANK_FINGERPRINTS.items():
-        for kw in keywords:
-            if kw in text:
-                return bank
+def _match_banks(text, fingerprints=BANK_FINGERPRINTS):
+    """Return every bank (in *fingerprints* order) whose fingerprint is in *text*."""
+    text = " ".join(text.upper().split())  # normalize whitespace
+    return [
+        bank for bank, keywords in fingerprints.items()
+        if any(kw in text for kw in keywords)
+    ]
 
-    return "UNKNOWN"
+
+def _fast_detect(doc):
+    """
+    Try the cheap sources first: PDF metadata, then the raw content
+    stream strings of page 1, matching multi-word fingerprints only.
+    Returns (bank, method) or (None, None) when inconclusive (no match,
+    or more than one bank matched).
+    """
+    meta = doc.metadata
+    meta_text = " ".join(
+        str(meta[k]) for k in _METADATA_KEYS if isinstance(meta.get(k), (str, bytes))
+    )
+    banks = _match_banks(meta_text, _FAST_FINGERPRINTS)
+    if len(banks) == 1:
+        return banks[0], "metadata"
+
+    if doc.page_count:
+        try:
+            raw_text = doc.page_raw_text(0)
+        except Exception:
+            raw_text = ""
+        banks = _match_banks(raw_text, _FAST_FINGERPRINTS)
+        if len(banks) == 1:
+            return banks[0], "content_stream"
+
+    return None, None
+
+
+def detect_bank_with_method(source):
+    """
+    Like ``detect_bank`` but also reports which path decided:
+    ``"metadata"``, ``"content_stream"`` or ``"layout"`` (the full
+    pdfplumber extraction of the first two pages).
+    """
+    with open_statement(source) as doc:
+        bank, method = _fast_detect(doc)
+        if bank:
+            return bank, method
+
+        text = ""
+        for page_text in doc.page_texts(0, 2):
+            text += "\n" + page_text
+
+    banks = _match_banks(text)
+    return (banks[0] if banks else "UNKNOWN"), "layout"
+
+
+def detect_bank(source):
+    """
+    Identify the bank from the first two pages.  *source* is a PDF path
+    or an already-open ``StatementDocument``.
+    """
+    return detect_bank_with_method(source)[0]
 
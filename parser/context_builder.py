@@ -7,11 +7,13 @@ context is now via the adapter pipeline (see adapters/).
 
 from parser.account_holder import extract_account_holder_name
 from parser.bank_detector import detect_bank
+from parser.statement_document import open_statement
 from adapters import get_adapter
 
 
-def build_statement_context(pdf_path):
+def build_statement_context(source):
     """Detect the bank and delegate to the appropriate adapter."""
-    bank = detect_bank(pdf_path)
-    adapter = get_adapter(bank)
-    return adapter.build_context(pdf_path)
+    with open_statement(source) as doc:
+        bank = detect_bank(doc)
+        adapter = get_adapter(bank)
+        return adapter.build_context(doc)
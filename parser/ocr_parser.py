@@ -1,14 +1,143 @@
-import pytesseract
-from PIL import Image
-import pdfplumber
+"""
+ocr_parser
+~~~~~~~~~~
+OCR fallback for scanned statements.
+
+Only pages without a text layer are OCR'd, and only if they contain an
+image to read; a page with any real text keeps it, however little.
+``page_has_text_layer`` lets ``StatementDocument`` find image-only pages
+up front (no text operators in the content stream
+means nothing for pdfplumber to extract) so they can be rasterized and
+OCR'd in parallel before the adapters start reading.
+
+Results are cached per page fingerprint (a hash of the page's content
+streams and images), so re-running a statement, or the same scanned page
+inside another statement, skips Tesseract entirely.
+
+pytesseract (and a local Tesseract binary) are optional; without them
+``ocr_available()`` is False and scanned pages stay empty.
+"""
+
+import hashlib
+import re
+from functools import lru_cache
+
+OCR_RESOLUTION = 300
+
+
+@lru_cache(maxsize=1)
+def ocr_available():
+    """True when pytesseract is installed and can find the Tesseract binary."""
+    try:
+        import pytesseract
+
+        pytesseract.get_tesseract_version()
+    except Exception:
+        return False
+    return True
+
+
+def _resolve(obj):
+    from pdfminer.pdftypes import resolve1
+
+    return resolve1(obj)
+
+
+# Any text-showing operator (literal or hex strings) in a content stream
+_TEXT_SHOW_RE = re.compile(rb"(?:\]\s*TJ|[)>]\s*(?:Tj|'|\"))")
+
+# Forms nested deeper than this are not inspected
+_MAX_FORM_DEPTH = 4
+
+
+def _subtype(xobj):
+    return getattr(_resolve(getattr(xobj, "attrs", {}).get("Subtype")), "name", None)
+
+
+def _walk_xobjects(resources, depth=0):
+    """Yield every XObject drawn from *resources*, descending into forms."""
+    xobjects = _resolve((resources or {}).get("XObject")) or {}
+    for ref in xobjects.values():
+        xobj = _resolve(ref)
+        yield xobj
+        if _subtype(xobj) == "Form" and depth < _MAX_FORM_DEPTH:
+            yield from _walk_xobjects(_resolve(xobj.attrs.get("Resources")), depth + 1)
+
+
+def _content_streams(page):
+    """The page's content streams followed by those of the forms it draws."""
+    for ref in page.page_obj.contents or []:
+        yield _resolve(ref)
+    for xobj in _walk_xobjects(_resolve(page.page_obj.resources)):
+        if _subtype(xobj) == "Form":
+            yield xobj
+
+
+def _stream_data(stream):
+    try:
+        return stream.get_data()
+    except Exception:
+        return b""
+
+
+def page_has_text_layer(page):
+    """
+    Cheap check on a pdfplumber *page*: does its content (or a form it
+    draws) show any text at all?  Fonts alone prove nothing (many PDF
+    producers declare one on image-only pages), so the content streams
+    are scanned for text-showing operators instead, with no layout work.
+    """
+    return any(_TEXT_SHOW_RE.search(_stream_data(s)) for s in _content_streams(page))
+
+
+def page_has_images(page):
+    """Whether a pdfplumber *page* draws any image XObject (something to OCR)."""
+    return any(
+        _subtype(xobj) == "Image"
+        for xobj in _walk_xobjects(_resolve(page.page_obj.resources))
+    )
+
+
+def page_fingerprint(page):
+    """SHA-256 of a page's content streams and image data (its OCR cache key)."""
+    h = hashlib.sha256()
+    for stream in _content_streams(page):
+        h.update(_stream_data(stream))
+    for xobj in _walk_xobjects(_resolve(page.page_obj.resources)):
+        if _subtype(xobj) == "Image":
+            h.update(xobj.get_rawdata() or _stream_data(xobj))
+    return h.hexdigest()
+
+
+def ocr_page(page, resolution=OCR_RESOLUTION):
+    """Rasterize a pdfplumber *page* and return Tesseract's text for it."""
+    # OCR is a rare fallback; its libraries load only when it runs
+    import pytesseract
+
+    image = page.to_image(resolution=resolution).original
+    return pytesseract.image_to_string(image)
+
+
+def ocr_page_indexes(source, indexes, resolution=OCR_RESOLUTION):
+    """
+    Worker entry point: OCR the pages *indexes* of *source* (a path or
+    the PDF bytes).  Returns ``[(index, text), ...]``.
+    """
+    from parser.statement_document import _open_pdf
+
+    with _open_pdf(source) as pdf:
+        return [(i, ocr_page(pdf.pages[i], resolution)) for i in indexes]
+
 
 def extract_text_with_ocr(pdf_path):
+    """OCR every page of *pdf_path* and return the text lines."""
+    from parser.statement_document import _open_pdf
+
     text_lines = []
 
-    with pdfplumber.open(pdf_path) as pdf:
+    with _open_pdf(pdf_path) as pdf:
         for page in pdf.pages:
-            image = page.to_image(resolution=300).original
-            text = pytesseract.image_to_string(image)
+            text = ocr_page(page)
             text_lines.extend(text.split("\n"))
 
     return text_lines
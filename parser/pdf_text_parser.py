@@ -8,13 +8,10 @@ Bank-specific transaction extraction logic lives in the adapter layer
 a thin helper for any code that only needs raw page text.
 """
 
-import pdfplumber
+from parser.statement_document import open_statement
 
 
-def extract_page_texts(pdf_path):
+def extract_page_texts(source):
     """Return a list of plain-text strings, one per PDF page."""
-    texts = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            texts.append(page.extract_text() or "")
-    return texts
\ No newline at end of file
+    with open_statement(source) as doc:
+        return list(doc.page_texts())
\ No newline at end of file
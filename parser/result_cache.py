@@ -0,0 +1,138 @@
+"""
+result_cache
+~~~~~~~~~~~~
+On-disk cache of parsed statements, keyed by the SHA-256 of the PDF
+bytes plus a fingerprint of the parsing rules.
+
+A hit returns the bank, account holder and statement context (with its
+normalized transactions), so the caller can go straight to
+classification, journal building and the writers.  Entries are JSON
+files; the cache is bounded by total size and evicts the least recently
+used entries first (access time is tracked via file mtime).
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+import config
+
+# Modules whose logic determines what ends up in a cached context:
+# every module of these packages (so a new rule module cannot be left
+# out), plus the records the transactions are built from.  Editing any
+# of them (or the config tables) changes the fingerprint, which makes
+# every existing entry unreachable.
+_RULE_PACKAGES = ["adapters", "parser"]
+_RULE_FILES = ["records.py"]
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rule_modules():
+    paths = []
+    for package in _RULE_PACKAGES:
+        names = sorted(n for n in os.listdir(os.path.join(_ROOT, package)) if n.endswith(".py"))
+        paths += [f"{package}/{name}" for name in names]
+    return paths + _RULE_FILES
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+@lru_cache(maxsize=1)
+def rules_version():
+    """Short hash of the config keyword tables and the parsing modules."""
+    h = hashlib.sha256()
+    tables = {
+        "CHARGE_KEYWORDS": config.CHARGE_KEYWORDS,
+        "LEDGER_MAP": config.LEDGER_MAP,
+        "BANK_FINGERPRINTS": config.BANK_FINGERPRINTS,
+    }
+    h.update(json.dumps(tables, sort_keys=True).encode("utf-8"))
+    for rel_path in _rule_modules():
+        # The path too, so moving code between modules is a change
+        h.update(rel_path.encode("utf-8"))
+        with open(os.path.join(_ROOT, rel_path), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def file_sha256(source):
+    """SHA-256 of a PDF given as a path or as its bytes."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+
+    h = hashlib.sha256()
+    with open(source, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU cache of parsed statements stored in *cache_dir*."""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for(self, source):
+        """Cache key for a PDF path or PDF bytes."""
+        return f"{file_sha256(source)}-{rules_version()}"
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached result for *key*, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+
+    def put(self, key, result):
+        """
+        Store *result* (a JSON-serialisable dict) under *key*, then evict
+        least-recently-used entries until the cache fits in max_bytes.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)  # atomic, so readers never see half a file
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        entries.sort()  # oldest access first
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
@@ -1,13 +1,102 @@
 import re
 
+from records import Transaction
+
 # Standard Regex (Amount + Balance)
 AMOUNT_RE = re.compile(r"([\d,]+\.\d{2})\s+([\d,]+\.\d{2})\s*(Dr|Cr)?", re.IGNORECASE)
 
 # Opening Balance Regex (Balance Only)
 OPENING_RE = re.compile(r"([\d,]+\.\d{2})\s*(Dr|Cr)?", re.IGNORECASE)
 
+# Any single amount; a description containing one goes the slow path
+AMOUNT_TOKEN_RE = re.compile(r"[\d,]+\.\d{2}")
+
+# Dr / Cr tag in any case, as AMOUNT_RE matches it
+_DR_CR = frozenset(d + r for d in "dDcC" for r in "rR")
+
+_is_amount = AMOUNT_TOKEN_RE.fullmatch
+
+def _paise(amount_str):
+    """"1,234.56" -> 123456 (the regexes guarantee two decimals)."""
+    return int(amount_str.replace(",", "").replace(".", ""))
+
+def _scan_tail(text):
+    """
+    Fast path for the usual row shape ``<description> <amount> <balance>
+    [Dr|Cr]``: split the last words off the right end of the line and
+    return ``(description, amount, balance, tag)``, or None when the
+    line does not end that way.
+
+    Also None when the description holds an amount of its own, or the
+    amount string occurs inside the balance: there the ``findall`` /
+    ``str.replace`` parsing of ``_split_row`` may pick other values, and
+    it still decides those rows.
+    """
+    # 1. Last three words; the last one may be the Dr/Cr tag
+    words = text.rsplit(None, 3)
+    if not words:
+        return None
+    tag = words[-1]
+    if tag in _DR_CR:
+        words.pop()
+    else:
+        tag = ""
+        words = text.rsplit(None, 2)
+    if len(words) < 2:
+        return None
+
+    # 2. Amount and balance, both whole words
+    amount_str = words[-2]
+    balance_str = words[-1]
+    if _is_amount(balance_str) is None or _is_amount(amount_str) is None:
+        return None
+    if amount_str in balance_str:
+        return None
+
+    # 3. Description: everything before the amount, sliced once
+    if len(words) < 3:
+        return "", amount_str, balance_str, tag
+    description = words[0]
+    if "." in description and AMOUNT_TOKEN_RE.search(description):
+        return None
+    if tag:
+        # As in _split_row, the tag is removed from the whole line
+        description = description.replace(tag, "")
+    return description, amount_str, balance_str, tag
+
+def _split_row(text):
+    """
+    ``(description, amount, balance, Dr/Cr tag)`` strings of a
+    transaction's text, or None if it has no amount + balance pair:
+    the last ``AMOUNT_RE`` match, and the text without its strings.
+    """
+    matches = AMOUNT_RE.findall(text)
+    if not matches:
+        return None
+
+    last_match = matches[-1]
+    dr_cr_tag = last_match[2].strip() if last_match[2] else ""
+
+    clean_desc = text
+    for part in last_match[:2]:
+        clean_desc = clean_desc.replace(part, "")
+    if dr_cr_tag:
+        clean_desc = clean_desc.replace(dr_cr_tag, "")
+    return clean_desc, last_match[0], last_match[1], dr_cr_tag
+
 def normalize_transactions(raw_txns):
-    normalized = []
+    return list(iter_normalized_transactions(raw_txns))
+
+def iter_normalized_transactions(raw_txns):
+    """
+    Generator form of ``normalize_transactions``: consumes *raw_txns*
+    (any iterable) lazily and yields each normalized row as soon as it
+    is parsed, carrying the running balance between rows.
+
+    Rows are ``records.Transaction`` (amounts in integer paise, read
+    like the old ``{date, description, amount, balance, direction}``
+    dicts).
+    """
     previous_balance = None
 
     for txn in raw_txns:
@@ -15,58 +104,44 @@ def normalize_transactions(raw_txns):
         if txn["date"] == "OPENING":
             match = OPENING_RE.search(txn["text"])
             if match:
-                bal_str = match.group(1).replace(",", "")
                 dr_cr = match.group(2).strip() if match.group(2) else ""
-                
-                val = float(bal_str)
+
+                val = _paise(match.group(1))
                 if "DR" in dr_cr.upper():
                     previous_balance = -val
                 else:
                     previous_balance = val
-            continue 
+            continue
 
         # --- PHASE 2: Handle Normal Transactions ---
-        matches = AMOUNT_RE.findall(txn["text"])
-        if not matches:
+        # Right-scan first; the regex decides the rows it declines
+        text = txn["text"]
+        row = _scan_tail(text) or _split_row(text)
+        if row is None:
             continue
 
-        last_match = matches[-1]
-        
-        amount = float(last_match[0].replace(",", ""))
-        balance_abs = float(last_match[1].replace(",", ""))
-        dr_cr_tag = last_match[2].strip() if last_match[2] else ""
+        clean_desc, amount_str, balance_str, dr_cr_tag = row
+        amount = _paise(amount_str)
+        balance_abs = _paise(balance_str)
 
         if "DR" in dr_cr_tag.upper():
             current_balance = -balance_abs
         else:
             current_balance = balance_abs
 
-        # Calculate Direction
+        # Calculate Direction (balances are exact paise, so any
+        # movement counts, down to a single paisa)
         direction = None
         if previous_balance is not None:
             delta = current_balance - previous_balance
-            if delta > 0.01:
+            if delta > 0:
                 direction = "credit"  # Sales
-            elif delta < -0.01:
+            elif delta < 0:
                 direction = "debit"   # Purchase
 
         # Clean Description
-        clean_desc = txn["text"]
-        for part in last_match[:2]:
-            clean_desc = clean_desc.replace(part, "")
-        if dr_cr_tag:
-            clean_desc = clean_desc.replace(dr_cr_tag, "")
-            
         clean_desc = clean_desc.replace('"', '').strip()
 
-        normalized.append({
-            "date": txn["date"],
-            "description": clean_desc,
-            "amount": amount,
-            "balance": current_balance,
-            "direction": direction
-        })
-
         previous_balance = current_balance
 
-    return normalized
\ No newline at end of file
+        yield Transaction(txn["date"], clean_desc, amount, current_balance, direction)
@@ -0,0 +1,312 @@
+"""
+statement_document
+~~~~~~~~~~~~~~~~~~
+A single parsed bank statement, shared by every stage of the pipeline.
+
+pdfplumber layout extraction is the most expensive step we run, so the
+PDF is opened once and each page's text is extracted lazily and
+memoized.  Bank detection, adapter extraction and account-holder
+extraction all accept either a source (path, bytes or binary file-like
+object) or a ``StatementDocument``.
+
+With ``enable_ocr()``, pages that have no usable text layer are OCR'd
+(see ``parser.ocr_parser``) and every stage reads the OCR text instead.
+"""
+
+import io
+import os
+import re
+from contextlib import contextmanager
+
+from parser.ocr_parser import (
+    OCR_RESOLUTION,
+    ocr_available,
+    ocr_page,
+    ocr_page_indexes,
+    page_fingerprint,
+    page_has_images,
+    page_has_text_layer,
+)
+
+
+# Text-showing operators in a raw content stream: a TJ array, or a single
+# literal string shown with Tj / ' / ".
+_TEXT_OP_RE = re.compile(
+    rb"\[((?:\\.|[^\\\]])*)\]\s*TJ"
+    rb"|\(((?:\\.|[^\\)])*)\)\s*(?:Tj|'|\")",
+    re.DOTALL,
+)
+_LITERAL_RE = re.compile(rb"\(((?:\\.|[^\\)])*)\)", re.DOTALL)
+_ESCAPE_RE = re.compile(rb"\\([0-7]{1,3}|.)", re.DOTALL)
+_ESCAPES = {
+    b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f",
+    b"\n": b"",  # backslash-newline is a line continuation
+}
+
+
+def _unescape(literal):
+    def repl(m):
+        code = m.group(1)
+        if code[:1].isdigit():
+            return bytes([int(code, 8) & 0xFF])
+        return _ESCAPES.get(code, code)
+    return _ESCAPE_RE.sub(repl, literal).decode("latin-1")
+
+
+def _open_pdf(source):
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    # Imported on first open: pdfplumber (and pdfminer under it) is the
+    # heaviest import in the tree, and many callers never open a PDF
+    import pdfplumber
+
+    return pdfplumber.open(source)
+
+
+def _extract_page_range(source, start, stop):
+    """Worker entry point: extract pages ``start`` .. ``stop - 1``."""
+    with _open_pdf(source) as pdf:
+        return start, [pdf.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+class StatementDocument:
+    """
+    Open PDF plus a per-page text cache.
+
+    *source* is a file path, the PDF's bytes, or a seekable binary
+    file-like object (e.g. a Streamlit upload), so the web app never has
+    to touch disk.  ``cache_limit`` bounds memory for streaming runs: only pages with an
+    index below it are memoized (detection and holder lookup only ever
+    look at the first two).  ``None`` caches every page.
+    """
+
+    def __init__(self, source, cache_limit=None):
+        # Path on disk, or None for in-memory sources
+        self.pdf_path = source if isinstance(source, (str, os.PathLike)) else None
+        self.cache_limit = cache_limit
+        self._pdf = _open_pdf(source)
+        self._page_texts = {}
+
+        # OCR fallback (off until enable_ocr); OCR text is always kept,
+        # whatever the cache_limit, since it is far too slow to redo.
+        self._ocr = None
+        self._ocr_texts = {}
+
+        # What a worker process re-opens in prefetch_pages()
+        if self.pdf_path is not None:
+            self._worker_source = self.pdf_path
+        elif isinstance(source, (bytes, bytearray)):
+            self._worker_source = bytes(source)
+        elif hasattr(source, "getvalue"):
+            self._worker_source = source.getvalue()
+        else:
+            self._worker_source = None
+
+    # ── Page access ────────────────────────────────────────────────────
+
+    @property
+    def page_count(self):
+        return len(self._pdf.pages)
+
+    def page_text(self, index):
+        """
+        Return the extracted text of page *index* ("" if it has none).
+        With OCR enabled, image pages with no extractable text return the OCR text.
+        """
+        if index in self._ocr_texts:
+            return self._ocr_texts[index]
+
+        if index in self._page_texts:
+            text = self._page_texts[index]
+        else:
+            page = self._pdf.pages[index]
+            text = page.extract_text() or ""
+            # Only the text is kept; drop pdfplumber's parsed layout objects
+            page.close()
+
+            if self.cache_limit is None or index < self.cache_limit:
+                self._page_texts[index] = text
+
+        if (self._ocr is not None and not text.strip()
+                and page_has_images(self._pdf.pages[index])):
+            # Not found up front by enable_ocr (the page shows text that
+            # extracts to nothing); OCR it on its own.  A page with any
+            # real text, such as a near-empty last page with a bank logo,
+            # keeps its text layer.
+            self._ocr_pages([index], workers=1)
+            return self._ocr_texts[index]
+        return text
+
+    def page_texts(self, start=0, stop=None):
+        """Yield the text of pages ``start`` .. ``stop - 1`` in order."""
+        if stop is None or stop > self.page_count:
+            stop = self.page_count
+        for i in range(start, stop):
+            yield self.page_text(i)
+
+    def page_raw_text(self, index):
+        """
+        Cheap text for page *index*: the literal strings shown by the
+        page's content stream, in stream order, with no layout analysis.
+
+        Strings inside one TJ array are joined directly; separate text
+        operators are joined with a space.  Hex strings and fonts with
+        custom encodings are not decoded, so the result may be partial;
+        callers must treat it as a hint, not a replacement for
+        ``page_text``.
+        """
+        return " ".join(self.page_raw_strings(index))
+
+    def page_raw_strings(self, index):
+        """``page_raw_text`` as a list: one string per text operator."""
+        from pdfminer.pdftypes import resolve1
+
+        contents = self._pdf.pages[index].page_obj.contents or []
+        pieces = []
+        for ref in contents:
+            stream = resolve1(ref)
+            try:
+                data = stream.get_data()
+            except Exception:
+                continue
+            for m in _TEXT_OP_RE.finditer(data):
+                if m.group(1) is not None:
+                    pieces.append("".join(
+                        _unescape(s) for s in _LITERAL_RE.findall(m.group(1))
+                    ))
+                else:
+                    pieces.append(_unescape(m.group(2)))
+        return pieces
+
+    @property
+    def metadata(self):
+        """The PDF's document-info dictionary (Title, Author, Producer...)."""
+        return self._pdf.metadata or {}
+
+    def prefetch_pages(self, workers, chunk_size=None, start=0):
+        """
+        Extract every not-yet-cached page from *start* on in *workers*
+        parallel processes and store the results in the page cache.
+
+        Each worker re-opens the PDF (from its path, or from its bytes for
+        in-memory documents) and handles a
+        contiguous chunk of pages, so later ``page_text`` calls are cache
+        hits and callers still see pages in document order.
+        """
+        pending = [i for i in range(start, self.page_count) if i not in self._page_texts]
+        if workers <= 1 or len(pending) < 2 or self._worker_source is None:
+            return
+
+        if chunk_size is None:
+            # A few chunks per worker keeps the pool busy when some
+            # pages are much denser than others.
+            chunk_size = max(1, -(-len(pending) // (workers * 4)))
+
+        ranges = []
+        for i in pending:
+            if ranges and ranges[-1][1] == i and ranges[-1][1] - ranges[-1][0] < chunk_size:
+                ranges[-1][1] = i + 1
+            else:
+                ranges.append([i, i + 1])
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_extract_page_range, self._worker_source, start, stop)
+                for start, stop in ranges
+            ]
+            for future in futures:
+                start, texts = future.result()
+                for offset, text in enumerate(texts):
+                    self._page_texts[start + offset] = text
+
+    # ── OCR fallback ───────────────────────────────────────────────────
+
+    def enable_ocr(self, workers=1, cache=None, resolution=OCR_RESOLUTION):
+        """
+        Turn on the OCR fallback and OCR every image-only page now, in
+        *workers* parallel processes.  *cache* is an optional
+        ``ResultCache`` holding OCR text per page fingerprint.
+
+        Returns the number of pages found without a text layer, or None
+        if OCR is unavailable (pytesseract / Tesseract not installed), in
+        which case the document is left unchanged.
+        """
+        if not ocr_available():
+            return None
+
+        self._ocr = {"cache": cache, "resolution": resolution}
+        scanned = [
+            i for i, page in enumerate(self._pdf.pages)
+            if i not in self._ocr_texts
+            and not page_has_text_layer(page) and page_has_images(page)
+        ]
+        self._ocr_pages(scanned, workers)
+        return len(scanned)
+
+    def _ocr_pages(self, indexes, workers):
+        """OCR *indexes* into ``_ocr_texts``, going through the OCR cache."""
+        cache = self._ocr["cache"]
+        resolution = self._ocr["resolution"]
+
+        keys = {}
+        pending = []
+        for i in indexes:
+            if cache is not None:
+                keys[i] = f"ocr-{page_fingerprint(self._pdf.pages[i])}-{resolution}"
+                hit = cache.get(keys[i])
+                if hit is not None:
+                    self._ocr_texts[i] = hit["text"]
+                    continue
+            pending.append(i)
+
+        if workers > 1 and len(pending) > 1 and self._worker_source is not None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Round-robin so every worker gets a similar share of pages
+            chunks = [pending[w::workers] for w in range(min(workers, len(pending)))]
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                futures = [
+                    pool.submit(ocr_page_indexes, self._worker_source, chunk, resolution)
+                    for chunk in chunks
+                ]
+                results = [r for future in futures for r in future.result()]
+        else:
+            results = [(i, ocr_page(self._pdf.pages[i], resolution)) for i in pending]
+
+        for i, text in results:
+            self._ocr_texts[i] = text
+            if cache is not None:
+                cache.put(keys[i], {"text": text})
+
+    # ── Lifecycle ──────────────────────────────────────────────────────
+
+    def close(self):
+        self._pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+@contextmanager
+def open_statement(source):
+    """
+    Yield a ``StatementDocument`` for *source*.
+
+    If *source* is already a ``StatementDocument`` it is reused and left
+    open for the caller; otherwise a new document is opened and closed
+    when the block exits.
+    """
+    if isinstance(source, StatementDocument):
+        yield source
+        return
+
+    doc = StatementDocument(source)
+    try:
+        yield doc
+    finally:
+        doc.close()
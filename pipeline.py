@@ -0,0 +1,125 @@
+"""
+pipeline
+~~~~~~~~
+Process one uploaded statement entirely in memory.
+
+``process_upload`` is a plain module-level function taking and returning
+only bytes / dicts, so it can run in a worker process (the web app's
+shared pool) without touching any per-session state or shared folders.
+``run_pipeline`` is the same thing but raises instead, which lets the
+job workers tell rejected statements apart from failures worth a retry.
+"""
+
+import os
+from functools import lru_cache
+
+from parser.account_holder import extract_account_holder_name
+from parser.bank_detector import detect_bank
+from parser.statement_document import StatementDocument
+from parser.result_cache import DEFAULT_MAX_BYTES, ResultCache
+from adapters import get_adapter
+from accounting.journal_builder import iter_journal_entries
+from writers.output_stage import output_filenames, output_targets, run_output_stage
+
+
+class StatementRejected(ValueError):
+    """The statement was read fine but cannot be processed (retrying won't help)."""
+
+
+@lru_cache(maxsize=None)
+def _result_cache(cache_dir, max_bytes):
+    # One ResultCache per worker process; it only holds the folder name,
+    # and writes are atomic, so processes can share the same folder.
+    return ResultCache(cache_dir, max_bytes)
+
+
+def process_upload(pdf_bytes, filename, cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Run ``run_pipeline`` without raising.
+    Returns ``(data, None)`` on success or ``(None, error message)``.
+    """
+    try:
+        return run_pipeline(pdf_bytes, filename, cache_dir, cache_max_bytes), None
+    except Exception as e:
+        return None, str(e)
+
+
+def run_pipeline(pdf_bytes, filename, cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES,
+                 ocr_workers=1):
+    """
+    *pdf_bytes* is the uploaded statement; outputs are returned as bytes.
+    With *cache_dir* set, parsed statements (and OCR'd pages) are reused
+    on re-upload.  Scanned pages are OCR'd in *ocr_workers* processes
+    when Tesseract is available; ``ocr_workers=0`` turns OCR off.
+
+    The Core Logic:
+    1. Detect Bank
+    2. Parse PDF
+    3. Classify Transactions (inc. Utility vs Credit Card logic)
+    4. Generate PDF & Excel
+
+    Raises ``StatementRejected`` for unsupported or empty statements.
+    """
+    cache = _result_cache(cache_dir, cache_max_bytes) if cache_dir else None
+
+    # Re-uploaded statements (same bytes, same rules) skip parsing
+    cache_key = cache.key_for(pdf_bytes) if cache else None
+    cached = cache.get(cache_key) if cache else None
+
+    if cached:
+        bank = cached["bank"]
+        account_holder = cached["account_holder"]
+        context = cached["context"]
+    else:
+        # Open the PDF once; detection, parsing and the holder lookup
+        # all reuse the same cached page text.
+        with StatementDocument(pdf_bytes) as doc:
+            # OCR pages without a text layer (scanned statements) first,
+            # so every later step reads their text. OCR'd pages share the
+            # result cache under their own "ocr-..." keys.
+            if ocr_workers:
+                doc.enable_ocr(workers=ocr_workers, cache=cache)
+
+            # A. Detect Bank & Build Context
+            bank = detect_bank(doc)
+            if not bank:
+                raise StatementRejected("Could not detect bank (Only JKB, HDFC, SBI supported).")
+
+            adapter = get_adapter(bank)
+            context = adapter.build_context(doc)
+
+            # B. Get Account Holder Name
+            account_holder = extract_account_holder_name(doc)
+
+        # A statement that parsed to nothing is rejected below; caching
+        # it would only spend cache space on a result nobody can use
+        if cache and context["transactions"]:
+            # Transaction records are stored as plain dicts
+            cache.put(cache_key, {
+                "bank": bank,
+                "account_holder": account_holder,
+                "context": dict(context, transactions=[dict(t) for t in context["transactions"]]),
+            })
+
+    # C. Process Transactions (classify + journal; opening balance
+    # rows are skipped)
+    entries = list(iter_journal_entries(context["transactions"]))
+
+    if not entries:
+        raise StatementRejected("No valid transactions found in statement.")
+
+    # D. Generate Outputs in memory (journal + Tally written concurrently)
+    stem = os.path.splitext(filename)[0]
+    names = output_filenames(stem)
+    stage = run_output_stage(entries, output_targets(stem, None), account_holder)
+
+    return {
+        "filename": filename,
+        "bank": bank,
+        "holder": account_holder,
+        "journal_data": stage["outputs"]["journal"],  # PDF bytes
+        "tally_data": stage["outputs"]["tally"],      # XLSX bytes
+        "journal_name": names["journal"],   # Filename for download
+        "tally_name": names["tally"],       # Filename for download
+        "timings": stage["timings"],        # Seconds per writer
+    }
@@ -0,0 +1,155 @@
+"""
+records
+~~~~~~~
+Compact records for normalized transactions and journal entries.
+
+A large batch keeps every normalized transaction and journal entry
+alive at once (``build_context`` lists them, ``run_output_stage`` fans
+them out to several writers).  As dicts, each one carries a hash table
+sized for its keys plus a float object per amount.  ``Transaction`` and
+``JournalEntry`` use ``__slots__`` instead, hold amounts as integer
+paise (exact, no float rounding between the statement and the
+writers), and intern the ledger / voucher / type strings, so entries
+loaded back from a columnar export share one copy of each.
+
+Both stay readable like the dicts they replace: ``record["amount"]``,
+``record.get("narration", "")``, ``"balance" in record`` and
+``dict(record)`` all work, with ``amount`` / ``balance`` in rupees
+(floats).  Code that builds the dicts itself (benchmarks, the batch
+journal, the result cache) keeps working; ``from_dict`` converts.
+"""
+
+import sys
+
+
+def to_paise(amount):
+    """Rupees to integer paise (None stays None)."""
+    return None if amount is None else round(amount * 100)
+
+
+def _rupees(paise):
+    return None if paise is None else paise / 100
+
+
+class _Record:
+    """Read-only mapping view over the slots; subclasses set ``KEYS``."""
+
+    __slots__ = ()
+
+    KEYS = ()
+
+    def __getitem__(self, key):
+        if key in self.KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def keys(self):
+        return self.KEYS
+
+    def items(self):
+        return [(k, getattr(self, k)) for k in self.KEYS]
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, s) == getattr(other, s) for s in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.KEYS)
+        return f"{type(self).__name__}({fields})"
+
+
+class Transaction(_Record):
+    """One normalized statement row (see ``parser.row_normalizer``)."""
+
+    __slots__ = ("date", "description", "amount_paise", "balance_paise", "direction")
+
+    KEYS = ("date", "description", "amount", "balance", "direction")
+
+    def __init__(self, date, description, amount_paise, balance_paise, direction):
+        self.date = date
+        self.description = description
+        self.amount_paise = amount_paise
+        self.balance_paise = balance_paise
+        self.direction = direction     # "credit" / "debit" / None
+
+    @property
+    def amount(self):
+        return _rupees(self.amount_paise)
+
+    @property
+    def balance(self):
+        return _rupees(self.balance_paise)
+
+    @classmethod
+    def from_dict(cls, txn):
+        """Convert a normalized transaction dict (or return a record as is)."""
+        if isinstance(txn, cls):
+            return txn
+        return cls(
+            txn["date"], txn["description"], to_paise(txn["amount"]),
+            to_paise(txn.get("balance")), txn.get("direction"),
+        )
+
+
+class JournalEntry(_Record):
+    """One journal entry (see ``accounting.journal_builder``)."""
+
+    __slots__ = (
+        "date", "debit", "credit", "amount_paise", "narration", "raw_description",
+        "voucher_type", "balance_paise", "direction", "type",
+    )
+
+    KEYS = (
+        "date", "debit", "credit", "amount", "narration", "raw_description",
+        "voucher_type", "balance", "direction", "type",
+    )
+
+    def __init__(self, date, debit, credit, amount_paise, narration, raw_description,
+                 voucher_type, balance_paise=None, direction=None, type=None):
+        self.date = date
+        self.debit = sys.intern(debit)
+        self.credit = sys.intern(credit)
+        self.amount_paise = amount_paise
+        self.narration = narration
+        self.raw_description = raw_description
+        self.voucher_type = sys.intern(voucher_type)
+        self.balance_paise = balance_paise
+        self.direction = direction
+        self.type = sys.intern(type) if type is not None else None   # classifier type
+
+    @property
+    def amount(self):
+        return _rupees(self.amount_paise)
+
+    @property
+    def balance(self):
+        return _rupees(self.balance_paise)
+
+    @classmethod
+    def from_dict(cls, entry):
+        """Convert a journal entry dict (or return a record as is)."""
+        if isinstance(entry, cls):
+            return entry
+        direction = entry.get("direction")
+        return cls(
+            entry["date"], entry["debit"], entry["credit"], to_paise(entry["amount"]),
+            entry.get("narration", ""), entry.get("raw_description", ""),
+            entry["voucher_type"], to_paise(entry.get("balance")),
+            sys.intern(direction) if direction is not None else None,
+            entry.get("type"),
+        )
@@ -0,0 +1,179 @@
+"""
+columnar
+~~~~~~~~
+Typed columnar export of a statement's journal, and the loader that
+turns it back into journal entries.
+
+Each statement's normalized transactions and journal entries go to one
+file with the columns in ``SCHEMA_FIELDS``, so re-rendering the journal
+or Tally sheet, or analytics across many statements, never has to parse
+the PDF again.  The account holder is kept in the schema metadata.
+
+Two formats are registered as outputs (see ``writers.output_stage``):
+
+``"parquet"``
+    Zstd-compressed Parquet; compact, the format to archive and to feed
+    analytics tools.  String columns are dictionary-encoded on disk.
+``"arrow"``
+    Uncompressed Arrow IPC file; bigger, but ``read_table`` memory-maps
+    it without copying or decoding anything.
+
+Entries are written in batches of ``BATCH_ROWS``, so the writer can
+consume a one-shot stream without holding the whole journal.
+
+pyarrow is optional (it is not in requirements.txt): it is imported only
+when one of these outputs is written or read.
+"""
+
+import datetime
+
+from parser.account_state import date_key
+from records import JournalEntry
+
+BATCH_ROWS = 8192
+
+FORMAT_VERSION = "1"
+
+# (column, arrow type name, journal entry key)
+SCHEMA_FIELDS = [
+    ("date", "string", "date"),             # as printed on the statement
+    ("posted_on", "date32", None),          # parsed; null if unreadable
+    ("description", "string", "raw_description"),
+    ("narration", "string", "narration"),
+    ("amount", "float64", "amount"),
+    ("balance", "float64", "balance"),
+    ("direction", "string", "direction"),   # "credit" / "debit" / null
+    ("type", "string", "type"),             # classifier type
+    ("debit", "string", "debit"),
+    ("credit", "string", "credit"),
+    ("voucher_type", "string", "voucher_type"),
+]
+
+_PARQUET_MAGIC = b"PAR1"
+_ARROW_MAGIC = b"ARROW1"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("the parquet / arrow outputs need pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def check_pyarrow():
+    """Raise ImportError now if pyarrow is missing, rather than mid-write."""
+    _pyarrow()
+
+
+def schema(account_holder=None):
+    """The export schema, with *account_holder* in its metadata."""
+    pa = _pyarrow()
+    fields = [pa.field(name, getattr(pa, type_name)()) for name, type_name, _ in SCHEMA_FIELDS]
+    metadata = {"format_version": FORMAT_VERSION}
+    if account_holder is not None:
+        metadata["account_holder"] = account_holder
+    return pa.schema(fields, metadata=metadata)
+
+
+def _posted_on(date):
+    key = date_key(date)
+    if key is None:
+        return None
+    try:
+        return datetime.date(*key)
+    except ValueError:
+        return None
+
+
+def _record_batch(pa, sch, entries):
+    columns = {name: [] for name, _, _ in SCHEMA_FIELDS}
+    for e in entries:
+        for name, _, key in SCHEMA_FIELDS:
+            columns[name].append(_posted_on(e["date"]) if key is None else e.get(key))
+    return pa.record_batch([pa.array(columns[f.name], type=f.type) for f in sch], schema=sch)
+
+
+def _batches(entries):
+    batch = []
+    for e in entries:
+        batch.append(e)
+        if len(batch) == BATCH_ROWS:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_columnar(entries, target, account_holder=None, fmt="parquet"):
+    """
+    Write *entries* (any iterable of journal entries) to *target*, a
+    file path or a binary file-like object, as ``fmt`` "parquet" or
+    "arrow".
+    """
+    pa = _pyarrow()
+    sch = schema(account_holder)
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(target, sch, compression="zstd")
+    elif fmt == "arrow":
+        writer = pa.ipc.new_file(target, sch)
+    else:
+        raise ValueError(f"unknown columnar format: {fmt!r}")
+
+    with writer:
+        for batch in _batches(entries):
+            writer.write_batch(_record_batch(pa, sch, batch))
+
+
+def read_table(source, columns=None, memory_map=True):
+    """
+    Read a file written by ``write_columnar`` (a path, or its bytes) as a
+    ``pyarrow.Table``; the format is detected from the file.  Arrow files
+    are memory-mapped when *memory_map* is set, so only the *columns*
+    actually used are paged in.
+    """
+    pa = _pyarrow()
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        head = bytes(source[:6])
+        buffer = pa.py_buffer(source)
+        open_source = lambda: pa.BufferReader(buffer)
+    else:
+        with open(source, "rb") as f:
+            head = f.read(6)
+        open_source = lambda: pa.memory_map(source) if memory_map else pa.OSFile(source)
+
+    if head.startswith(_PARQUET_MAGIC):
+        import pyarrow.parquet as pq
+
+        return pq.read_table(open_source(), columns=columns)
+    if head == _ARROW_MAGIC:
+        table = pa.ipc.open_file(open_source()).read_all()
+        return table.select(columns) if columns is not None else table
+    raise ValueError("not a parquet or arrow statement export")
+
+
+def account_holder_of(table):
+    """The account holder stored with an exported statement (or None)."""
+    metadata = table.schema.metadata or {}
+    holder = metadata.get(b"account_holder")
+    return holder.decode("utf-8") if holder is not None else None
+
+
+def load_entries(source):
+    """
+    Rebuild the journal entries (``records.JournalEntry``, so ledger
+    names are shared again) of an exported statement.
+    Returns ``(entries, account_holder)``; *entries* can go straight to
+    ``run_output_stage``.
+    """
+    table = read_table(source)
+    keys = [(name, key) for name, _, key in SCHEMA_FIELDS if key is not None]
+    entries = [
+        JournalEntry.from_dict({key: row[name] for name, key in keys})
+        for row in table.select([name for name, _ in keys]).to_pylist()
+    ]
+    return entries, account_holder_of(table)
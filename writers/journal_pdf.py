@@ -1,121 +1,240 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.units import mm
-
-def generate_journal_pdf(entries, output_path, account_holder_name):
-    # Setup Document
-    doc = SimpleDocTemplate(
-        output_path,
-        pagesize=A4,
-        rightMargin=10*mm, leftMargin=10*mm,
-        topMargin=10*mm, bottomMargin=10*mm
-    )
-    
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # 1. Title
-    header_style = styles["Heading1"]
-    header_style.alignment = 1  # Center
-    title = Paragraph(f"{account_holder_name}'s Journal", header_style)
-    elements.append(title)
-    elements.append(Spacer(1, 10*mm))
-    
-    # 2. Prepare Table Data
-    # --- SIMPLIFIED OUTPUT: Only Date, Narration, Debit, Credit ---
-    # Headers
-    data = [[
-        Paragraph("<b>Date</b>", styles["Normal"]),
-        Paragraph("<b>Narration</b>", styles["Normal"]),
-        Paragraph("<b>Debit (Rs.)</b>", styles["Normal"]),
-        Paragraph("<b>Credit (Rs.)</b>", styles["Normal"])
-    ]]
-
-    # --- ORIGINAL HEADERS (commented out for future use) ---
-    # data = [[
-    #     Paragraph("<b>Date</b>", styles["Normal"]),
-    #     Paragraph("<b>Particulars</b>", styles["Normal"]),
-    #     Paragraph("<b>Debit (Rs.)</b>", styles["Normal"]),
-    #     Paragraph("<b>Credit (Rs.)</b>", styles["Normal"])
-    # ]]
-    
-    normal_style = styles["Normal"]
-    
-    for e in entries:
-        date = e["date"]
-        amount = f"{e['amount']:,.2f}"
-        narration = e.get("narration", "")
-
-        # --- SIMPLIFIED OUTPUT: Only Date, Narration, Debit, Credit ---
-        # Determine debit/credit amount based on direction
-        # If the entry debits the bank (i.e., money coming IN = sales/receipt),
-        # it's a credit to the party. If it credits the bank (money going OUT),
-        # it's a debit to the party.
-        debit_ledger = e.get("debit", "")
-        debit_amount = ""
-        credit_amount = ""
-
-        # If Bank A/c is debited, money came IN → show as Credit
-        # If Bank A/c is credited, money went OUT → show as Debit
-        if debit_ledger == "Bank A/c":
-            # Money IN (Sales/Receipt) → Credit column
-            credit_amount = amount
-        else:
-            # Money OUT (Purchase/Payment) → Debit column
-            debit_amount = amount
-
-        row = [
-            Paragraph(date, normal_style),
-            Paragraph(narration, normal_style),
-            Paragraph(debit_amount, normal_style),
-            Paragraph(credit_amount, normal_style)
-        ]
-        data.append(row)
-
-        # --- ORIGINAL ROW FORMAT (commented out for future use) ---
-        # debit_ledger = e["debit"]
-        # credit_ledger = e["credit"]
-        # narration = e.get("narration", "")
-        #
-        # # Format Particulars Column:
-        # # Debit A/c ... Dr
-        # #   To Credit A/c
-        # #   (Being Narration...)
-        # particulars_html = f"""
-        # <b>{debit_ledger} Dr.</b><br/>
-        # &nbsp;&nbsp;&nbsp;&nbsp;To {credit_ledger}<br/>
-        # <font color="grey" size="9"><i>(Being {narration})</i></font>
-        # """
-        #
-        # row = [
-        #     Paragraph(date, normal_style),
-        #     Paragraph(particulars_html, normal_style),
-        #     Paragraph(amount, normal_style),
-        #     Paragraph(amount, normal_style)
-        # ]
-        # data.append(row)
-        
-    # 3. Create Table with Grid Lines
-    # Widths: Date(25), Narration(95), Dr(35), Cr(35) -> Fits A4
-    cw = [25*mm, 95*mm, 35*mm, 35*mm]
-    
-    t = Table(data, colWidths=cw, repeatRows=1)
-    
-    # Add Excel-like Grid Styling
-    t.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey), # Header Grey
-        ('ALIGN', (0,0), (-1,-1), 'LEFT'),               # Default Left Align
-        ('ALIGN', (2,0), (-1,-1), 'RIGHT'),              # Amounts Right Align
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),               # Vertical Top Align
-        ('GRID', (0,0), (-1,-1), 0.5, colors.black),     # SOLID BLACK LINES
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),   # Header Bold
-        ('BOTTOMPADDING', (0,0), (-1,-1), 6),            # Padding
-        ('TOPPADDING', (0,0), (-1,-1), 6),
-    ]))
-    
-    elements.append(t)
-    
-    # 4. Build PDF
-    doc.build(elements)
\ No newline at end of file
+# reportlab is imported inside the renderers so that importing this
+# module (e.g. through the output stage) does not load it.  Same value
+# as reportlab.lib.units.mm, for the layout constants below.
+mm = 72.0 / 2.54 * 0.1
+
+# Widths: Date(25), Narration(95), Dr(35), Cr(35) -> Fits A4
+COL_WIDTHS = [25*mm, 95*mm, 35*mm, 35*mm]
+HEADERS = ["Date", "Narration", "Debit (Rs.)", "Credit (Rs.)"]
+MARGIN = 10*mm
+
+# From this many entries on (or for an iterator of unknown length) the
+# journal is drawn straight onto the canvas instead of through a
+# platypus Table.
+FAST_RENDER_MIN_ROWS = 500
+
+# Geometry shared with the Table renderer so both modes look the same
+_CELL_PAD = 6           # TOPPADDING / BOTTOMPADDING / Table cell padding
+_FRAME_PAD = 6          # SimpleDocTemplate frame padding
+_FONT = "Helvetica"
+_FONT_BOLD = "Helvetica-Bold"
+_FONT_SIZE = 10         # styles["Normal"]
+_LEADING = 12
+_GRID_WIDTH = 0.5
+
+def _journal_row(e):
+    """Return (date, narration, debit_amount, credit_amount) strings for an entry."""
+    date = e["date"]
+    amount = f"{e['amount']:,.2f}"
+    narration = e.get("narration", "")
+
+    # --- SIMPLIFIED OUTPUT: Only Date, Narration, Debit, Credit ---
+    # Determine debit/credit amount based on direction
+    # If the entry debits the bank (i.e., money coming IN = sales/receipt),
+    # it's a credit to the party. If it credits the bank (money going OUT),
+    # it's a debit to the party.
+    debit_ledger = e.get("debit", "")
+    debit_amount = ""
+    credit_amount = ""
+
+    # If Bank A/c is debited, money came IN → show as Credit
+    # If Bank A/c is credited, money went OUT → show as Debit
+    if debit_ledger == "Bank A/c":
+        # Money IN (Sales/Receipt) → Credit column
+        credit_amount = amount
+    else:
+        # Money OUT (Purchase/Payment) → Debit column
+        debit_amount = amount
+
+    return date, narration, debit_amount, credit_amount
+
+def generate_journal_pdf(entries, output_path, account_holder_name, fast=None, rows=None):
+    """
+    Render the journal for *entries* to *output_path* (a file path or a
+    binary file-like object such as ``BytesIO``).
+
+    ``fast=None`` picks the renderer automatically: journals with fewer
+    than FAST_RENDER_MIN_ROWS entries go through the platypus Table,
+    longer ones are drawn row by row on the canvas.  The length is
+    ``len(entries)``, or for an iterator the *rows* hint (its entry
+    count, or at least FAST_RENDER_MIN_ROWS); iterators without a hint
+    go to the canvas.
+    """
+    if fast is None:
+        if hasattr(entries, "__len__"):
+            rows = len(entries)
+        fast = rows is None or rows >= FAST_RENDER_MIN_ROWS
+
+    if fast:
+        _render_canvas(entries, output_path, account_holder_name)
+    else:
+        _render_table(entries, output_path, account_holder_name)
+
+def _title_paragraph(account_holder_name, styles):
+    from reportlab.platypus import Paragraph
+
+    header_style = styles["Heading1"]
+    header_style.alignment = 1  # Center
+    return Paragraph(f"{account_holder_name}'s Journal", header_style)
+
+def _render_table(entries, output_path, account_holder_name):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+    # Setup Document
+    doc = SimpleDocTemplate(
+        output_path,
+        pagesize=A4,
+        rightMargin=MARGIN, leftMargin=MARGIN,
+        topMargin=MARGIN, bottomMargin=MARGIN
+    )
+    
+    elements = []
+    styles = getSampleStyleSheet()
+    
+    # 1. Title
+    elements.append(_title_paragraph(account_holder_name, styles))
+    elements.append(Spacer(1, 10*mm))
+    
+    # 2. Prepare Table Data
+    # --- SIMPLIFIED OUTPUT: Only Date, Narration, Debit, Credit ---
+    # Headers
+    data = [[Paragraph(f"<b>{h}</b>", styles["Normal"]) for h in HEADERS]]
+
+    # --- ORIGINAL HEADERS (commented out for future use) ---
+    # data = [[
+    #     Paragraph("<b>Date</b>", styles["Normal"]),
+    #     Paragraph("<b>Particulars</b>", styles["Normal"]),
+    #     Paragraph("<b>Debit (Rs.)</b>", styles["Normal"]),
+    #     Paragraph("<b>Credit (Rs.)</b>", styles["Normal"])
+    # ]]
+    
+    normal_style = styles["Normal"]
+    
+    for e in entries:
+        data.append([Paragraph(cell, normal_style) for cell in _journal_row(e)])
+
+        # --- ORIGINAL ROW FORMAT (commented out for future use) ---
+        # debit_ledger = e["debit"]
+        # credit_ledger = e["credit"]
+        # narration = e.get("narration", "")
+        #
+        # # Format Particulars Column:
+        # # Debit A/c ... Dr
+        # #   To Credit A/c
+        # #   (Being Narration...)
+        # particulars_html = f"""
+        # <b>{debit_ledger} Dr.</b><br/>
+        # &nbsp;&nbsp;&nbsp;&nbsp;To {credit_ledger}<br/>
+        # <font color="grey" size="9"><i>(Being {narration})</i></font>
+        # """
+        #
+        # row = [
+        #     Paragraph(date, normal_style),
+        #     Paragraph(particulars_html, normal_style),
+        #     Paragraph(amount, normal_style),
+        #     Paragraph(amount, normal_style)
+        # ]
+        # data.append(row)
+        
+    # 3. Create Table with Grid Lines
+    t = Table(data, colWidths=COL_WIDTHS, repeatRows=1)
+    
+    # Add Excel-like Grid Styling
+    t.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey), # Header Grey
+        ('ALIGN', (0,0), (-1,-1), 'LEFT'),               # Default Left Align
+        ('ALIGN', (2,0), (-1,-1), 'RIGHT'),              # Amounts Right Align
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),               # Vertical Top Align
+        ('GRID', (0,0), (-1,-1), _GRID_WIDTH, colors.black), # SOLID BLACK LINES
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),   # Header Bold
+        ('BOTTOMPADDING', (0,0), (-1,-1), _CELL_PAD),    # Padding
+        ('TOPPADDING', (0,0), (-1,-1), _CELL_PAD),
+    ]))
+    
+    elements.append(t)
+    
+    # 4. Build PDF
+    doc.build(elements)
+
+def _render_canvas(entries, output_path, account_holder_name):
+    """
+    Fast renderer for long journals: draws the same grid as the Table
+    renderer directly on the canvas, one row at a time, so layout cost is
+    linear and *entries* can be a one-shot iterator.  Only narrations
+    wider than their column are wrapped with a Paragraph.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfgen import canvas
+    from reportlab.platypus import Paragraph
+    from xml.sax.saxutils import escape
+
+    page_w, page_h = A4
+    styles = getSampleStyleSheet()
+    normal_style = styles["Normal"]
+
+    c = canvas.Canvas(output_path, pagesize=A4)
+
+    x_edges = [MARGIN]
+    for w in COL_WIDTHS:
+        x_edges.append(x_edges[-1] + w)
+    narration_width = COL_WIDTHS[1] - 2 * _CELL_PAD
+    frame_top = page_h - MARGIN - _FRAME_PAD
+    frame_bottom = MARGIN + _FRAME_PAD
+    single_row_h = _LEADING + 2 * _CELL_PAD
+
+    def draw_row(cells, top, height, font):
+        baseline = top - _CELL_PAD - _FONT_SIZE
+        c.setFont(font, _FONT_SIZE)
+        for x, cell in zip(x_edges, cells):
+            if isinstance(cell, Paragraph):
+                cell.drawOn(c, x + _CELL_PAD, top - _CELL_PAD - cell.height)
+            elif cell:
+                c.drawString(x + _CELL_PAD, baseline, cell)
+
+        # Grid: bottom edge plus the column rules for this row
+        bottom = top - height
+        c.line(x_edges[0], bottom, x_edges[-1], bottom)
+        for x in x_edges:
+            c.line(x, top, x, bottom)
+
+    def start_table(top):
+        # Header row, repeated on every page
+        c.setLineWidth(_GRID_WIDTH)
+        c.setFillColor(colors.lightgrey)
+        c.rect(x_edges[0], top - single_row_h, x_edges[-1] - x_edges[0], single_row_h, stroke=0, fill=1)
+        c.setFillColor(colors.black)
+        c.line(x_edges[0], top, x_edges[-1], top)
+        draw_row(HEADERS, top, single_row_h, _FONT_BOLD)
+        return top - single_row_h
+
+    # 1. Title (first page only), then the same 10mm spacer
+    title = _title_paragraph(account_holder_name, styles)
+    _, title_h = title.wrap(page_w - 2 * (MARGIN + _FRAME_PAD), page_h)
+    title.drawOn(c, MARGIN + _FRAME_PAD, frame_top - title_h)
+    y = start_table(frame_top - title_h - title.style.spaceAfter - 10*mm)
+
+    # 2. Rows
+    for e in entries:
+        date, narration, debit_amount, credit_amount = _journal_row(e)
+
+        row_h = single_row_h
+        if stringWidth(narration, _FONT, _FONT_SIZE) > narration_width:
+            narration = Paragraph(escape(narration), normal_style)
+            _, h = narration.wrap(narration_width, page_h)
+            row_h = h + 2 * _CELL_PAD
+
+        if y - row_h < frame_bottom:
+            c.showPage()
+            y = start_table(frame_top)
+
+        draw_row([date, narration, debit_amount, credit_amount], y, row_h, _FONT)
+        y -= row_h
+
+    c.showPage()
+    c.save()
@@ -0,0 +1,218 @@
+"""
+output_stage
+~~~~~~~~~~~~
+Run every output writer for one statement in a single stage.
+
+Writers are registered by name with ``register_output`` (the journal
+PDF and Tally sheet are built in) and are independent of each other, so
+the stage runs them concurrently and reports how long each one took.
+
+Executors:
+
+``"stream"``
+    *entries* may be a one-shot iterator; it is consumed once and fed to
+    every writer through ``tee_to_writers`` (one thread per writer).
+``"thread"``
+    Thread pool over a materialized entry list.  Cheap to start; the
+    writers are mostly pure Python, so overlap is limited to the zlib
+    compression and file I/O that release the GIL.
+``"process"``
+    Process pool: true parallelism for large journals at the cost of
+    pickling the entries to each worker.  Writers must be registered at
+    import time of a module the workers also import.
+"""
+
+import io
+import itertools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import NULL_RECORDER
+from writers.columnar import check_pyarrow, write_columnar
+from writers.journal_pdf import FAST_RENDER_MIN_ROWS, generate_journal_pdf
+from writers.stream import tee_to_writers
+from writers.tally_excel import generate_tally_excel
+
+# name -> (filename suffix, write(entries, target, account_holder, rows))
+OUTPUT_WRITERS = {}
+
+# Streamed entries are counted up to this many before the writers start,
+# which is all the journal needs to pick its renderer.
+ROW_HINT_LIMIT = FAST_RENDER_MIN_ROWS
+
+# name -> check() raising ImportError when an optional dependency is missing
+_OUTPUT_CHECKS = {}
+
+DEFAULT_OUTPUTS = ("journal", "tally")
+
+
+def register_output(name, suffix, write, check=None):
+    """
+    Register an output writer.  *write* is called as
+    ``write(entries, target, account_holder, rows)``, where *rows* is the
+    number of entries, capped at ``ROW_HINT_LIMIT`` when they are
+    streamed; *suffix* is appended to the statement's stem to name the
+    file (e.g. ``" Journal.pdf"``).
+    *check*, if given, raises ImportError when the writer cannot run.
+    """
+    OUTPUT_WRITERS[name] = (suffix, write)
+    if check is not None:
+        _OUTPUT_CHECKS[name] = check
+
+
+def check_outputs(outputs):
+    """
+    Raise ValueError if any name in *outputs* is not a registered output,
+    or if one of them is missing an optional dependency.
+    """
+    unknown = [name for name in outputs if name not in OUTPUT_WRITERS]
+    if unknown:
+        raise ValueError(
+            f"unknown output(s): {', '.join(unknown)} (available: {', '.join(OUTPUT_WRITERS)})"
+        )
+    if not outputs:
+        raise ValueError("no outputs selected")
+    for name in outputs:
+        check = _OUTPUT_CHECKS.get(name)
+        if check is not None:
+            try:
+                check()
+            except ImportError as e:
+                raise ValueError(f"output '{name}': {e}") from e
+
+
+def _write_journal(entries, target, account_holder, rows=None):
+    # The row count picks the renderer even when entries are streamed
+    generate_journal_pdf(entries, target, account_holder, rows=rows)
+
+
+def _write_tally(entries, target, account_holder, rows=None):
+    generate_tally_excel(entries, target)
+
+
+def _write_parquet(entries, target, account_holder, rows=None):
+    write_columnar(entries, target, account_holder, fmt="parquet")
+
+
+def _write_arrow(entries, target, account_holder, rows=None):
+    write_columnar(entries, target, account_holder, fmt="arrow")
+
+
+register_output("journal", " Journal.pdf", _write_journal)
+register_output("tally", " Tally.xlsx", _write_tally)
+# Columnar exports for re-rendering / analytics (need pyarrow)
+register_output("parquet", " Transactions.parquet", _write_parquet, check_pyarrow)
+register_output("arrow", " Transactions.arrow", _write_arrow, check_pyarrow)
+
+
+def output_filenames(stem, outputs=DEFAULT_OUTPUTS):
+    """Map each output name to its file name, e.g. 'sbi' -> 'sbi Journal.pdf'."""
+    return {name: f"{stem}{OUTPUT_WRITERS[name][0]}" for name in outputs}
+
+
+def output_targets(stem, folder, outputs=DEFAULT_OUTPUTS):
+    """
+    Map each output name to its file path, e.g. 'sbi' -> 'out/sbi Journal.pdf'.
+    With ``folder=None`` every target is None, i.e. written in memory.
+    """
+    return {
+        name: None if folder is None else os.path.join(folder, filename)
+        for name, filename in output_filenames(stem, outputs).items()
+    }
+
+
+def _timed_write(name, entries, target, account_holder, rows=None):
+    """Run one writer; a None *target* is written to memory and returned as bytes."""
+    start = time.perf_counter()
+    buffer = io.BytesIO() if target is None else None
+    OUTPUT_WRITERS[name][1](entries, buffer or target, account_holder, rows)
+    output = buffer.getvalue() if buffer is not None else target
+    return name, time.perf_counter() - start, output
+
+
+def _counted(entries, stage, recorder):
+    """Yield *entries*, then add how many the writer read to *stage*'s items."""
+    count = 0
+    try:
+        for entry in entries:
+            count += 1
+            yield entry
+    finally:
+        recorder.add_items(stage, count)
+
+
+def run_output_stage(entries, targets, account_holder, executor="thread", recorder=NULL_RECORDER):
+    """
+    Write every output in *targets* (``{name: path or None}``) concurrently.
+
+    Returns ``{"outputs": {name: path}, "timings": {name: seconds}}``;
+    outputs whose target is None are written in memory and returned as
+    ``bytes`` in place of the path.
+    If any writer fails, the first error is re-raised after the others
+    have finished.
+
+    *recorder* records each writer as stage ``write:<name>``.  With the
+    "stream" executor a writer's wall time includes waiting for entries;
+    with "process" only wall time is known.
+    """
+    timings = {}
+    outputs = {}
+
+    if executor == "stream":
+        # Read ahead up to ROW_HINT_LIMIT entries so the writers get a row
+        # count (exact for short journals) without materializing the rest
+        entries = iter(entries)
+        head = list(itertools.islice(entries, ROW_HINT_LIMIT))
+        rows = len(head)
+        entries = itertools.chain(head, entries)
+
+        def make_writer(name, target):
+            def write(it):
+                if recorder is not NULL_RECORDER:
+                    it = _counted(it, f"write:{name}", recorder)
+                with recorder.stage(f"write:{name}"):
+                    _, timings[name], outputs[name] = _timed_write(
+                        name, it, target, account_holder, rows,
+                    )
+            return write
+
+        tee_to_writers(entries, [make_writer(n, t) for n, t in targets.items()])
+        return {"outputs": outputs, "timings": timings}
+
+    write = _timed_write
+    if executor == "process":
+        # Imported here: the default executors never start processes
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool_cls = ProcessPoolExecutor
+    elif executor == "thread":
+        pool_cls = ThreadPoolExecutor
+
+        def write(name, *args):
+            with recorder.stage(f"write:{name}"):
+                return _timed_write(name, *args)
+    else:
+        raise ValueError(f"unknown output executor: {executor!r}")
+
+    entries = list(entries)
+    error = None
+    with pool_cls(max_workers=len(targets) or 1) as pool:
+        futures = [
+            pool.submit(write, name, entries, target, account_holder, len(entries))
+            for name, target in targets.items()
+        ]
+        for future in futures:
+            try:
+                name, timings[name], outputs[name] = future.result()
+            except Exception as e:
+                error = error or e
+            else:
+                if executor == "process":
+                    recorder.record(f"write:{name}", timings[name], items=len(entries))
+                else:
+                    recorder.add_items(f"write:{name}", len(entries))
+
+    if error:
+        raise error
+    return {"outputs": outputs, "timings": timings}
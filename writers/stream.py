@@ -0,0 +1,86 @@
+"""
+stream
+~~~~~~
+Feed a single pass over a journal-entry iterator to several writers.
+
+Each writer is a callable that takes an iterator of entries (for example
+``lambda it: generate_tally_excel(it, path)``).  Writers run in their own
+threads and read from small bounded queues, so the producer (extraction,
+normalization, classification) runs once and at most ``buffer_size``
+entries per writer are held in memory at a time.
+"""
+
+import queue
+import threading
+
+_DONE = object()
+_ABORT = object()
+
+
+class WriterInputAborted(RuntimeError):
+    """Raised inside a writer when the entry producer failed part-way."""
+
+
+def tee_to_writers(entries, writers, buffer_size=256):
+    """
+    Iterate *entries* once, handing every entry to each writer.
+
+    Re-raises the first exception from the producer or any writer.  If
+    the producer fails, writers see ``WriterInputAborted`` instead of a
+    normal end of input, so they do not finish a truncated output.
+    """
+    queues = [queue.Queue(maxsize=buffer_size) for _ in writers]
+    errors = [None] * len(writers)
+
+    def run(i, writer):
+        q = queues[i]
+        finished = False
+
+        def items():
+            nonlocal finished
+            while True:
+                item = q.get()
+                if item is _DONE or item is _ABORT:
+                    finished = True
+                    if item is _ABORT:
+                        raise WriterInputAborted("entry producer failed")
+                    return
+                yield item
+
+        try:
+            writer(items())
+        except BaseException as e:
+            errors[i] = e
+
+        # Keep draining so the producer never blocks on a writer that
+        # stopped early (or failed).
+        while not finished:
+            item = q.get()
+            finished = item is _DONE or item is _ABORT
+
+    threads = [
+        threading.Thread(target=run, args=(i, w), daemon=True)
+        for i, w in enumerate(writers)
+    ]
+    for t in threads:
+        t.start()
+
+    try:
+        for entry in entries:
+            for q in queues:
+                q.put(entry)
+    except BaseException:
+        for q in queues:
+            q.put(_ABORT)
+        for t in threads:
+            t.join()
+        raise
+
+    for q in queues:
+        q.put(_DONE)
+    for t in threads:
+        t.join()
+
+    for e in errors:
+        if e is not None:
+            raise e
@@ -1,115 +1,142 @@
-import pandas as pd
-import os
-
-
-def generate_tally_excel(entries, output_path):
-    rows = []
-    # voucher_number = 1  # Commented out: not needed for simplified output
-
-    for e in entries:
-        date = e["date"]
-        amount = round(float(e["amount"]), 2)
-        narration = e.get("narration", "")
-        debit_ledger = e.get("debit", "")
-
-        # --- SIMPLIFIED OUTPUT: Only Date, Narration, Debit, Credit ---
-        # Determine debit/credit amount based on direction
-        debit_amount = ""
-        credit_amount = ""
-
-        # If Bank A/c is debited, money came IN → Credit column
-        # If Bank A/c is credited, money went OUT → Debit column
-        if debit_ledger == "Bank A/c":
-            credit_amount = amount
-        else:
-            debit_amount = amount
-
-        rows.append({
-            "Date": date,
-            "Narration": narration,
-            "Debit": debit_amount,
-            "Credit": credit_amount
-        })
-
-        # --- ORIGINAL TALLY FORMAT (commented out for future use) ---
-        # debit_ledger = e["debit"]
-        # credit_ledger = e["credit"]
-        # voucher_type = e.get("voucher_type", "Payment")
-        #
-        # # --- Row ordering based on voucher type ---
-        # # Receipt: Cr ledger first (Row 1), Dr ledger second (Row 2)
-        # # Payment/Contra: Dr ledger first (Row 1), Cr ledger second (Row 2)
-        #
-        # if voucher_type == "Receipt":
-        #     # Row 1: Credit ledger (with date, voucher info, narration)
-        #     rows.append({
-        #         "Voucher Date": date,
-        #         "Voucher Type Name": voucher_type,
-        #         "Voucher Number": voucher_number,
-        #         "Ledger Name": credit_ledger,
-        #         "Ledger Amount": amount,
-        #         "Ledger Amount Dr/Cr": "Cr",
-        #         "Narration": narration
-        #     })
-        #     # Row 2: Debit ledger (blank date/voucher/narration)
-        #     rows.append({
-        #         "Voucher Date": "",
-        #         "Voucher Type Name": "",
-        #         "Voucher Number": "",
-        #         "Ledger Name": debit_ledger,
-        #         "Ledger Amount": amount,
-        #         "Ledger Amount Dr/Cr": "Dr",
-        #         "Narration": ""
-        #     })
-        # else:
-        #     # Payment or Contra
-        #     # Row 1: Debit ledger (with date, voucher info, narration)
-        #     rows.append({
-        #         "Voucher Date": date,
-        #         "Voucher Type Name": voucher_type,
-        #         "Voucher Number": voucher_number,
-        #         "Ledger Name": debit_ledger,
-        #         "Ledger Amount": amount,
-        #         "Ledger Amount Dr/Cr": "Dr",
-        #         "Narration": narration
-        #     })
-        #     # Row 2: Credit ledger (blank date/voucher/narration)
-        #     rows.append({
-        #         "Voucher Date": "",
-        #         "Voucher Type Name": "",
-        #         "Voucher Number": "",
-        #         "Ledger Name": credit_ledger,
-        #         "Ledger Amount": amount,
-        #         "Ledger Amount Dr/Cr": "Cr",
-        #         "Narration": ""
-        #     })
-        #
-        # voucher_number += 1
-
-    # --- SIMPLIFIED COLUMNS ---
-    df = pd.DataFrame(rows, columns=[
-        "Date",
-        "Narration",
-        "Debit",
-        "Credit"
-    ])
-
-    # --- ORIGINAL COLUMNS (commented out for future use) ---
-    # df = pd.DataFrame(rows, columns=[
-    #     "Voucher Date",
-    #     "Voucher Type Name",
-    #     "Voucher Number",
-    #     "Ledger Name",
-    #     "Ledger Amount",
-    #     "Ledger Amount Dr/Cr",
-    #     "Narration"
-    # ])
-
-    # Ensure output folder exists
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-    # Safe overwrite
-    if os.path.exists(output_path):
-        os.remove(output_path)
-
-    df.to_excel(output_path, index=False, sheet_name="Accounting Voucher")
+import os
+
+SHEET_NAME = "Accounting Voucher"
+
+# --- SIMPLIFIED COLUMNS ---
+COLUMNS = ["Date", "Narration", "Debit", "Credit"]
+
+# --- ORIGINAL COLUMNS (commented out for future use) ---
+# df = pd.DataFrame(rows, columns=[
+#     "Voucher Date",
+#     "Voucher Type Name",
+#     "Voucher Number",
+#     "Ledger Name",
+#     "Ledger Amount",
+#     "Ledger Amount Dr/Cr",
+#     "Narration"
+# ])
+
+def _tally_row(e):
+    """One output row (Date, Narration, Debit, Credit) for a journal entry."""
+    date = e["date"]
+    amount = round(float(e["amount"]), 2)
+    narration = e.get("narration", "")
+    debit_ledger = e.get("debit", "")
+
+    # --- SIMPLIFIED OUTPUT: Only Date, Narration, Debit, Credit ---
+    # Determine debit/credit amount based on direction
+    # If Bank A/c is debited, money came IN → Credit column
+    # If Bank A/c is credited, money went OUT → Debit column
+    if debit_ledger == "Bank A/c":
+        return date, narration, None, amount
+    return date, narration, amount, None
+
+    # --- ORIGINAL TALLY FORMAT (commented out for future use) ---
+    # debit_ledger = e["debit"]
+    # credit_ledger = e["credit"]
+    # voucher_type = e.get("voucher_type", "Payment")
+    #
+    # # --- Row ordering based on voucher type ---
+    # # Receipt: Cr ledger first (Row 1), Dr ledger second (Row 2)
+    # # Payment/Contra: Dr ledger first (Row 1), Cr ledger second (Row 2)
+    #
+    # if voucher_type == "Receipt":
+    #     # Row 1: Credit ledger (with date, voucher info, narration)
+    #     rows.append({
+    #         "Voucher Date": date,
+    #         "Voucher Type Name": voucher_type,
+    #         "Voucher Number": voucher_number,
+    #         "Ledger Name": credit_ledger,
+    #         "Ledger Amount": amount,
+    #         "Ledger Amount Dr/Cr": "Cr",
+    #         "Narration": narration
+    #     })
+    #     # Row 2: Debit ledger (blank date/voucher/narration)
+    #     rows.append({
+    #         "Voucher Date": "",
+    #         "Voucher Type Name": "",
+    #         "Voucher Number": "",
+    #         "Ledger Name": debit_ledger,
+    #         "Ledger Amount": amount,
+    #         "Ledger Amount Dr/Cr": "Dr",
+    #         "Narration": ""
+    #     })
+    # else:
+    #     # Payment or Contra
+    #     # Row 1: Debit ledger (with date, voucher info, narration)
+    #     rows.append({
+    #         "Voucher Date": date,
+    #         "Voucher Type Name": voucher_type,
+    #         "Voucher Number": voucher_number,
+    #         "Ledger Name": debit_ledger,
+    #         "Ledger Amount": amount,
+    #         "Ledger Amount Dr/Cr": "Dr",
+    #         "Narration": narration
+    #     })
+    #     # Row 2: Credit ledger (blank date/voucher/narration)
+    #     rows.append({
+    #         "Voucher Date": "",
+    #         "Voucher Type Name": "",
+    #         "Voucher Number": "",
+    #         "Ledger Name": credit_ledger,
+    #         "Ledger Amount": amount,
+    #         "Ledger Amount Dr/Cr": "Cr",
+    #         "Narration": ""
+    #     })
+    #
+    # voucher_number += 1
+
+def _prepare_output(output_path):
+    # File-like targets (e.g. BytesIO) need no filesystem preparation
+    if not isinstance(output_path, (str, os.PathLike)):
+        return
+
+    # Ensure output folder exists
+    folder = os.path.dirname(output_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    # Safe overwrite
+    if os.path.exists(output_path):
+        os.remove(output_path)
+
+def generate_tally_excel(entries, output_path, engine="openpyxl"):
+    """
+    Write the Tally sheet for *entries* (any iterable of journal entries)
+    to *output_path*, a file path or a binary file-like object.
+
+    The default ``"openpyxl"`` engine streams rows straight into a
+    write-only worksheet, so memory stays flat in the number of entries
+    and pandas is not imported.  ``engine="pandas"`` is the previous
+    DataFrame-based writer, kept for comparison.
+    """
+    if engine == "pandas":
+        return _generate_with_pandas(entries, output_path)
+
+    # Imported here so importing the writers stays cheap for callers
+    # (CLI startup, pool workers) that never reach this stage
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(SHEET_NAME)
+    ws.append(COLUMNS)
+    for e in entries:
+        # Debit / Credit stay numeric cells; the unused side is left blank
+        ws.append(_tally_row(e))
+
+    _prepare_output(output_path)
+    wb.save(output_path)
+
+def _generate_with_pandas(entries, output_path):
+    # Imported here so the default engine never pays pandas' import cost
+    import pandas as pd
+
+    rows = []
+    for e in entries:
+        # Blank (not NaN) for the unused Debit / Credit side
+        row = ["" if v is None else v for v in _tally_row(e)]
+        rows.append(dict(zip(COLUMNS, row)))
+    df = pd.DataFrame(rows, columns=COLUMNS)
+
+    _prepare_output(output_path)
+    df.to_excel(output_path, index=False, sheet_name=SHEET_NAME)